@@ -29,7 +29,6 @@ export default function AdminDashboard() {
   const [stats, setStats] = useState(null)
   const [users, setUsers] = useState([])
   const [posts, setPosts] = useState([])
-  const [comments, setComments] = useState([])
   const [loading, setLoading] = useState(true)
   const [activeTab, setActiveTab] = useState('overview')
   const [events, setEvents] = useState([])
@@ -66,46 +65,12 @@ export default function AdminDashboard() {
         ? 'http://localhost:8000' 
         : 'https://passa-a-bola.onrender.com'
       
-      const [postsResponse, commentsResponse] = await Promise.all([
-        fetch(`${API_BASE_URL}/posts`),
-        fetch(`${API_BASE_URL}/comments`) 
-      ])
-
-      const postsData = await postsResponse.json()
-      const commentsData = await commentsResponse.json()
-      
-      if (postsData && commentsData && Array.isArray(postsData) && Array.isArray(commentsData)) {
-        const postsByDay = {
-          'Seg': 0, 'Ter': 0, 'Qua': 0, 'Qui': 0, 'Sex': 0, 'Sáb': 0, 'Dom': 0
-        }
-        
-        const commentsByDay = {
-          'Seg': 0, 'Ter': 0, 'Qua': 0, 'Qui': 0, 'Sex': 0, 'Sáb': 0, 'Dom': 0
-        }
-
-        postsData.forEach(post => {
-          if (post && post.created_at) {
-            const postDate = new Date(post.created_at)
-            const dayNames = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
-            const dayName = dayNames[postDate.getDay()]
-            postsByDay[dayName]++
-          }
-        })
-
-        commentsData.forEach(comment => {
-          if (comment && comment.created_at) {
-            const commentDate = new Date(comment.created_at)
-            const dayNames = ['Dom', 'Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb']
-            const dayName = dayNames[commentDate.getDay()]
-            commentsByDay[dayName]++
-          }
-        })
+      // Agregado no servidor: só as 7 linhas da semana, qualquer que seja o tamanho das tabelas
+      const response = await fetch(`${API_BASE_URL}/admin/engagement`)
+      const data = await response.json()
 
-        return Object.entries(postsByDay).map(([day, posts]) => ({
-          day,
-          posts,
-          comments: commentsByDay[day] || 0 
-        }))
+      if (data.success && Array.isArray(data.data)) {
+        return data.data
       }
     } catch (error) {
       console.error('Erro ao buscar dados de engajamento:', error)
@@ -193,11 +158,11 @@ export default function AdminDashboard() {
         ? 'http://localhost:8000' 
         : 'https://passa-a-bola.onrender.com'
 
-      const [statsRes, usersRes, postsRes, commentsRes, engagementData] = await Promise.all([
+      // Totais e gráfico vêm dos contadores do servidor; nada aqui cresce com as tabelas
+      const [statsRes, usersRes, postsRes, engagementData] = await Promise.all([
         fetch(`${API_BASE_URL}/admin/stats`),
         fetch(`${API_BASE_URL}/admin/users`),
-        fetch(`${API_BASE_URL}/posts`),
-        fetch(`${API_BASE_URL}/comments`), 
+        fetch(`${API_BASE_URL}/posts?limit=10`),
         fetchEngagementData()
       ])
         
@@ -221,13 +186,6 @@ export default function AdminDashboard() {
         setPosts([])
       }
 
-      const commentsData = await commentsRes.json()
-      if (Array.isArray(commentsData)) {
-        setComments(commentsData)
-      } else {
-        setComments([])
-      }
-
       setEngagementData(engagementData)
 
       // Carrega eventos também
@@ -237,7 +195,6 @@ export default function AdminDashboard() {
       console.error('Erro ao buscar dados:', error)
       setUsers([])
       setPosts([])
-      setComments([])
       setEvents([])
       setStats({
         total_users: 0,
@@ -357,9 +314,10 @@ export default function AdminDashboard() {
 
   const realMetrics = {
     postsPerUser: stats ? (stats.total_posts / Math.max(stats.total_users, 1)).toFixed(1) : '0',
-    activeRate: stats ? ((stats.active_users / Math.max(stats.total_users, 1)) * 100).toFixed(1) : '0',
+    // active_users vem null quando o servidor não tem os contadores (só count): mostra "—", não 0%
+    activeRate: !stats ? '0' : stats.active_users == null ? null : ((stats.active_users / Math.max(stats.total_users, 1)) * 100).toFixed(1),
     commentsPerPost: stats && stats.total_posts > 0 ? (stats.total_comments / stats.total_posts).toFixed(1) : '0',
-    totalComments: comments.length 
+    totalComments: stats?.total_comments || 0
   }
 
   // Tabs para mobile
@@ -495,8 +453,8 @@ export default function AdminDashboard() {
                 },
                 { 
                   title: 'Atividade', 
-                  value: `${realMetrics.activeRate}%`, 
-                  subtitle: `${stats?.active_users || 0} ativos`,
+                  value: realMetrics.activeRate === null ? '—' : `${realMetrics.activeRate}%`, 
+                  subtitle: stats?.active_users == null && stats ? 'ativos indisponível' : `${stats?.active_users || 0} ativos`,
                   icon: <Activity className="h-5 w-5 sm:h-6 sm:w-6" />,
                   color: 'from-orange-500 to-orange-600'
                 }
@@ -521,7 +479,7 @@ export default function AdminDashboard() {
                 <h3 className="text-lg sm:text-xl font-bold bg-gradient-to-r from-[#5E2E8C] to-[#7E3EB4] bg-clip-text text-transparent">
                   Engajamento Semanal
                 </h3>
-                <span className="text-xs sm:text-sm text-gray-500">Dados reais</span>
+                <span className="text-xs sm:text-sm text-gray-500">Últimos 7 dias</span>
               </div>
               <div className="flex items-end space-x-2 sm:space-x-4 h-32 sm:h-48 overflow-x-auto pb-2">
                 {engagementData.map((item, index) => (
@@ -1243,12 +1201,12 @@ export default function AdminDashboard() {
                 <div>
                   <div className="flex justify-between mb-2 sm:mb-3">
                     <span className="font-medium text-gray-700 text-sm sm:text-base">Taxa de Usuários Ativos</span>
-                    <span className="font-bold text-[#5E2E8C] text-base sm:text-lg">{realMetrics.activeRate}%</span>
+                    <span className="font-bold text-[#5E2E8C] text-base sm:text-lg">{realMetrics.activeRate === null ? '—' : `${realMetrics.activeRate}%`}</span>
                   </div>
                   <div className="w-full bg-gray-200 rounded-full h-2 sm:h-3">
                     <div 
                       className="bg-gradient-to-r from-orange-500 to-orange-600 h-2 sm:h-3 rounded-full transition-all duration-500" 
-                      style={{ width: `${realMetrics.activeRate}%` }}
+                      style={{ width: `${realMetrics.activeRate || 0}%` }}
                     ></div>
                   </div>
                 </div>
@@ -207,8 +207,11 @@ const ExportMenu = ({ users, posts, stats, engagementData }) => {
       'Total de Usuários': stats.total_users,
       'Total de Posts': stats.total_posts,
       'Total de Comentários': stats.total_comments,
-      'Usuários Ativos': stats.active_users,
-      'Taxa de Atividade': `${((stats.active_users / Math.max(stats.total_users, 1)) * 100).toFixed(1)}%`,
+      // null quando o servidor só tem o count das tabelas, sem os contadores
+      'Usuários Ativos': stats.active_users ?? 'indisponível',
+      'Taxa de Atividade': stats.active_users == null
+        ? 'indisponível'
+        : `${((stats.active_users / Math.max(stats.total_users, 1)) * 100).toFixed(1)}%`,
       'Posts por Usuário': (stats.total_posts / Math.max(stats.total_users, 1)).toFixed(1),
       'Data da Exportação': new Date().toLocaleString('pt-BR')
     }]
@@ -16,6 +16,8 @@ export default function UserProfileModal({ userId, currentUser, onClose, onFollo
   const [showFollowing, setShowFollowing] = useState(false);
   const [followers, setFollowers] = useState([]);
   const [following, setFollowing] = useState([]);
+  const [followersNextOffset, setFollowersNextOffset] = useState(null);
+  const [followingNextOffset, setFollowingNextOffset] = useState(null);
   const [selectedPost, setSelectedPost] = useState(null);
   const [nestedUser, setNestedUser] = useState(null);
   const [postsError, setPostsError] = useState(null);
@@ -39,14 +41,21 @@ export default function UserProfileModal({ userId, currentUser, onClose, onFollo
       }
 
       // BUSCAR POSTS CORRIGIDA - mesma estrutura da comunidade
-      const postsRes = await fetch(`${API_BASE_URL}/posts`);
-      
-      if (!postsRes.ok) {
-        throw new Error(`Erro ${postsRes.status}: Não foi possível carregar os posts`);
-      }
-      
-      const allPosts = await postsRes.json();
-      const userPostsData = allPosts.filter(post => post.user_id === userId);
+      // Só os posts do usuário, seguindo o cursor até a última página
+      const userPostsData = [];
+      let cursor = null;
+      do {
+        const url = `${API_BASE_URL}/posts?user_id=${encodeURIComponent(userId)}&limit=100`
+          + (cursor ? `&before=${encodeURIComponent(cursor)}` : "");
+        const postsRes = await fetch(url);
+
+        if (!postsRes.ok) {
+          throw new Error(`Erro ${postsRes.status}: Não foi possível carregar os posts`);
+        }
+
+        userPostsData.push(...(await postsRes.json()));
+        cursor = postsRes.headers.get("X-Next-Cursor");
+      } while (cursor);
       
       const postsWithLikes = await Promise.all(
         userPostsData.map(async (post) => {
@@ -98,19 +107,8 @@ export default function UserProfileModal({ userId, currentUser, onClose, onFollo
           setIsFollowing(followData.is_following);
         }
 
-        const followersRes = await fetch(`${API_BASE_URL}/user/${userId}/followers`);
-        if (followersRes.ok) {
-          const followersData = await followersRes.json();
-          setFollowers(followersData.followers || []);
-          setFollowersCount(followersData.followers.length);
-        }
-
-        const followingRes = await fetch(`${API_BASE_URL}/user/${userId}/following`);
-        if (followingRes.ok) {
-          const followingData = await followingRes.json();
-          setFollowing(followingData.following || []);
-          setFollowingCount(followingData.following.length);
-        }
+        await fetchFollowers();
+        await fetchFollowing();
       }
 
     } catch (error) {
@@ -324,6 +322,14 @@ export default function UserProfileModal({ userId, currentUser, onClose, onFollo
                   <span className="text-[var(--primary-color)] text-xs">Ver perfil</span>
                 </div>
               ))}
+              {followersNextOffset !== null && (
+                <button
+                  onClick={() => fetchFollowers(followersNextOffset)}
+                  className="w-full py-2 text-sm font-medium text-[var(--primary-color)]"
+                >
+                  Carregar mais
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -331,6 +337,29 @@ export default function UserProfileModal({ userId, currentUser, onClose, onFollo
     </div>
   );
 
+  // Listas paginadas: offset > 0 acrescenta a próxima página
+  const fetchFollowers = async (offset = 0) => {
+    const res = await fetch(`${API_BASE_URL}/user/${userId}/followers?offset=${offset}`);
+    if (res.ok) {
+      const data = await res.json();
+      const page = data.followers || [];
+      setFollowers(prev => offset > 0 ? [...prev, ...page] : page);
+      setFollowersCount(data.count ?? page.length);
+      setFollowersNextOffset(data.next_offset ?? null);
+    }
+  };
+
+  const fetchFollowing = async (offset = 0) => {
+    const res = await fetch(`${API_BASE_URL}/user/${userId}/following?offset=${offset}`);
+    if (res.ok) {
+      const data = await res.json();
+      const page = data.following || [];
+      setFollowing(prev => offset > 0 ? [...prev, ...page] : page);
+      setFollowingCount(data.count ?? page.length);
+      setFollowingNextOffset(data.next_offset ?? null);
+    }
+  };
+
   const FollowingModal = () => (
     <div className="fixed inset-0 bg-[#0000006d] flex items-center justify-center z-60 p-4">
       <div className="bg-white rounded-2xl shadow-xl max-w-md w-full max-h-[70vh] overflow-hidden">
@@ -367,6 +396,14 @@ export default function UserProfileModal({ userId, currentUser, onClose, onFollo
                   <span className="text-[var(--primary-color)] text-xs">Ver perfil</span>
                 </div>
               ))}
+              {followingNextOffset !== null && (
+                <button
+                  onClick={() => fetchFollowing(followingNextOffset)}
+                  className="w-full py-2 text-sm font-medium text-[var(--primary-color)]"
+                >
+                  Carregar mais
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -11,6 +11,103 @@ import {MessageCircle , Heart, Video, Image } from "lucide-react";
 const API_BASE_URL = "https://passa-a-bola.onrender.com";
 const MAX_POST_LENGTH = 500;
 
+// Imagens enviadas pelo /upload podem ganhar variantes WebP (thumbnail,
+// feed, full); as URLs ficam salvas no post em image_variants. Posts antigos,
+// GIFs e SVGs não têm variantes e usam o original
+const imageVariantUrl = (post, variant) =>
+  (post.image_variants && post.image_variants[variant]) || post.image;
+
+// Vídeos sobem em pedaços pelo upload retomável: se a conexão cair, o mesmo
+// arquivo continua de onde parou em vez de recomeçar do zero. Os pedaços vão
+// em ordem, um por vez: o storage grava cada um no offset seguinte
+const MAX_IMAGE_SIZE_MB = 50;
+const MAX_VIDEO_SIZE_MB = 500;
+const RESUMABLE_CHUNK_RETRIES = 3;
+
+const uploadVideoResumable = async (file) => {
+  const resumeKey = `upload-session:${file.name}:${file.size}:${file.lastModified}`;
+  let session = null;
+
+  const fetchSession = async (sessionId) => {
+    const res = await fetch(`${API_BASE_URL}/uploads/sessions/${sessionId}`);
+    return res.ok ? res.json() : null;
+  };
+
+  const savedSessionId = localStorage.getItem(resumeKey);
+  if (savedSessionId) {
+    session = await fetchSession(savedSessionId);
+  }
+
+  if (session?.status === "complete") {
+    localStorage.removeItem(resumeKey);
+    return { success: true, url: session.url, filename: session.filename, type: "video" };
+  }
+
+  if (!session || session.status !== "open") {
+    const res = await fetch(`${API_BASE_URL}/uploads/sessions`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ filename: file.name, content_type: file.type, size: file.size }),
+    });
+    if (!res.ok) {
+      const errorData = await res.json().catch(() => ({}));
+      throw new Error(errorData.detail || "Erro ao iniciar o upload");
+    }
+    session = await res.json();
+    localStorage.setItem(resumeKey, session.session_id);
+  }
+
+  // Retorna true se o servidor pediu para ressincronizar (pedaço fora de ordem)
+  const sendChunk = async (index) => {
+    const start = index * session.chunk_size;
+    const chunk = file.slice(start, Math.min(start + session.chunk_size, file.size));
+
+    for (let attempt = 1; ; attempt++) {
+      let res = null;
+      try {
+        res = await fetch(`${API_BASE_URL}/uploads/sessions/${session.session_id}/chunks/${index}`, {
+          method: "PUT",
+          body: chunk,
+        });
+      } catch (error) {
+        // Queda de rede: tenta de novo só este pedaço
+        if (attempt >= RESUMABLE_CHUNK_RETRIES) throw error;
+      }
+
+      if (res?.ok) return false;
+      if (res?.status === 409) return true;
+      if (res && (res.status < 500 || attempt >= RESUMABLE_CHUNK_RETRIES)) {
+        const errorData = await res.json().catch(() => ({}));
+        throw new Error(errorData.detail || `Erro ao enviar o pedaço ${index}`);
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000 * attempt));
+    }
+  };
+
+  let next = session.received_chunks.length;
+  while (next < session.total_chunks) {
+    if (await sendChunk(next)) {
+      const current = await fetchSession(session.session_id);
+      if (!current || current.status !== "open") throw new Error("Sessão de upload perdida");
+      session = current;
+      next = session.received_chunks.length;
+    } else {
+      next += 1;
+    }
+  }
+
+  const res = await fetch(`${API_BASE_URL}/uploads/sessions/${session.session_id}/complete`, {
+    method: "POST",
+  });
+  if (!res.ok) {
+    const errorData = await res.json().catch(() => ({}));
+    throw new Error(errorData.detail || "Erro ao finalizar o upload");
+  }
+
+  localStorage.removeItem(resumeKey);
+  return res.json();
+};
+
 export default function CommunityPage() {
   const router = useRouter();
   const [user, setUser] = useState(null);
@@ -21,6 +118,8 @@ export default function CommunityPage() {
   const [showPostModal, setShowPostModal] = useState(false);
   const [newPostText, setNewPostText] = useState("");
   const [newPostImage, setNewPostImage] = useState(null);
+  // URLs das variantes devolvidas pelo /upload, por URL do original
+  const [uploadedVariants, setUploadedVariants] = useState({});
   const [newPostVideo, setNewPostVideo] = useState(null);
   const [loading, setLoading] = useState(false);
   const [editingPost, setEditingPost] = useState(null);
@@ -36,7 +135,10 @@ export default function CommunityPage() {
   // Novos estados para controle de carregamento e erro
   const [postsLoading, setPostsLoading] = useState(true);
   const [postsError, setPostsError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [followingLoading, setFollowingLoading] = useState(false);
+  const [followingNextOffset, setFollowingNextOffset] = useState(null);
 
   // Novo estado para controlar likes em loading
   const [likesLoading, setLikesLoading] = useState({});
@@ -74,24 +176,35 @@ export default function CommunityPage() {
     }
   }, [searchTerm, posts]);
 
-  const fetchPosts = async (userId) => {
-    setPostsLoading(true);
+  const fetchPosts = async (userId, cursor = null) => {
+    if (cursor) {
+      setLoadingMore(true);
+    } else {
+      setPostsLoading(true);
+    }
     setPostsError(null);
     
     try {
-      const res = await fetch(`${API_BASE_URL}/posts`);
+      const url = cursor
+        ? `${API_BASE_URL}/posts?before=${encodeURIComponent(cursor)}`
+        : `${API_BASE_URL}/posts`;
+      const res = await fetch(url);
       
       if (!res.ok) {
         throw new Error(`Erro ${res.status}: Não foi possível carregar os posts`);
       }
       
       const data = await res.json();
+      setNextCursor(res.headers.get("X-Next-Cursor"));
       
       // Se não há posts, definir array vazio
       if (!data || data.length === 0) {
-        setPosts([]);
-        setFilteredPosts([]);
+        if (!cursor) {
+          setPosts([]);
+          setFilteredPosts([]);
+        }
         setPostsLoading(false);
+        setLoadingMore(false);
         return;
       }
       
@@ -120,6 +233,7 @@ export default function CommunityPage() {
               likes: likesCount,
               likedBy: likedByUser ? [user.name] : [],
               image: post.image,
+              image_variants: post.image_variants,
               video: post.video,
               created_at: post.created_at
             };
@@ -136,6 +250,7 @@ export default function CommunityPage() {
               likes: post.likes_count || 0,
               likedBy: [],
               image: post.image,
+              image_variants: post.image_variants,
               video: post.video,
               created_at: post.created_at,
               error: true
@@ -145,17 +260,21 @@ export default function CommunityPage() {
       );
       
       const validPosts = postsWithLikes.filter(post => post !== null);
-      setPosts(validPosts);
-      fetchCommentsCount(validPosts);
-      setFilteredPosts(validPosts);
+      const allPosts = cursor ? [...posts, ...validPosts] : validPosts;
+      setPosts(allPosts);
+      fetchCommentsCount(allPosts);
+      setFilteredPosts(allPosts);
       
     } catch (error) {
       console.error("Erro ao buscar posts:", error);
-      setPostsError(error.message);
-      setPosts([]);
-      setFilteredPosts([]);
+      if (!cursor) {
+        setPostsError(error.message);
+        setPosts([]);
+        setFilteredPosts([]);
+      }
     } finally {
       setPostsLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -181,13 +300,16 @@ export default function CommunityPage() {
     };
   };
 
-  const fetchFollowing = async (userId) => {
-    setFollowingLoading(true);
+  // Paginado: offset > 0 acrescenta a próxima página
+  const fetchFollowing = async (userId, offset = 0) => {
+    setFollowingLoading(offset === 0);
     try {
-      const res = await fetch(`${API_BASE_URL}/user/${userId}/following`);
+      const res = await fetch(`${API_BASE_URL}/user/${userId}/following?offset=${offset}`);
       if (res.ok) {
         const data = await res.json();
-        setFollowing(data.following || []);
+        const page = data.following || [];
+        setFollowing(prev => offset > 0 ? [...prev, ...page] : page);
+        setFollowingNextOffset(data.next_offset ?? null);
       } else {
         setFollowing([]);
       }
@@ -256,6 +378,9 @@ export default function CommunityPage() {
       // Adicionar URL da mídia se existir
       if (newPostImage) {
         postData.image = newPostImage;
+        if (uploadedVariants[newPostImage]) {
+          postData.image_variants = uploadedVariants[newPostImage];
+        }
       }
       if (newPostVideo) {
         postData.video = newPostVideo;
@@ -428,34 +553,43 @@ const handleDeletePost = async (postId) => {
       return;
     }
 
-    // Validar tamanho do arquivo (50MB máximo)
-    const maxSize = 50 * 1024 * 1024; // 50MB
-    if (file.size > maxSize) {
-      alert('Arquivo muito grande. Máximo 50MB permitido.');
+    // Validar tamanho do arquivo (imagens 50MB, vídeos 500MB)
+    const isVideo = file.type.startsWith('video/');
+    const maxSizeMb = isVideo ? MAX_VIDEO_SIZE_MB : MAX_IMAGE_SIZE_MB;
+    if (file.size > maxSizeMb * 1024 * 1024) {
+      alert(`Arquivo muito grande. Máximo ${maxSizeMb}MB permitido.`);
       return;
     }
 
     setLoading(true);
     
     try {
-      const formData = new FormData();
-      formData.append('file', file);
-      
-      const uploadRes = await fetch(`${API_BASE_URL}/upload`, {
-        method: 'POST',
-        body: formData,
-      });
+      let uploadData;
+      if (isVideo) {
+        uploadData = await uploadVideoResumable(file);
+      } else {
+        const formData = new FormData();
+        formData.append('file', file);
+        
+        const uploadRes = await fetch(`${API_BASE_URL}/upload`, {
+          method: 'POST',
+          body: formData,
+        });
+
+        if (!uploadRes.ok) {
+          const errorData = await uploadRes.json();
+          throw new Error(errorData.detail || 'Erro no servidor de upload');
+        }
 
-      if (!uploadRes.ok) {
-        const errorData = await uploadRes.json();
-        throw new Error(errorData.detail || 'Erro no servidor de upload');
+        uploadData = await uploadRes.json();
       }
-
-      const uploadData = await uploadRes.json();
       
       if (uploadData.success) {
         if (uploadData.type === 'image') {
           setNewPostImage(uploadData.url);
+          if (uploadData.variants) {
+            setUploadedVariants(prev => ({ ...prev, [uploadData.url]: uploadData.variants }));
+          }
           setNewPostVideo(null);
         } else if (uploadData.type === 'video') {
           setNewPostVideo(uploadData.url);
@@ -596,8 +730,16 @@ const handleDeletePost = async (postId) => {
     if (post.image) {
       return (
         <img
-          src={post.image}
+          src={imageVariantUrl(post, "feed")}
           alt="Post"
+          loading="lazy"
+          onError={(e) => {
+            // Variante ainda não gerada (ou falhou): usa o original
+            if (post.image_variants && !e.currentTarget.dataset.fallback) {
+              e.currentTarget.dataset.fallback = "1";
+              e.currentTarget.src = post.image;
+            }
+          }}
           className="rounded-lg max-h-80 mx-auto items-center  mb-3"
         />
       );
@@ -878,6 +1020,18 @@ const handleDeletePost = async (postId) => {
                       </div>
                     ))
                   )}
+
+                  {nextCursor && !searchTerm && (
+                    <div className="text-center py-4">
+                      <button
+                        onClick={() => user && fetchPosts(user.id, nextCursor)}
+                        disabled={loadingMore}
+                        className="bg-gray-100 text-gray-700 px-4 py-2 rounded-lg hover:bg-gray-200 transition-colors disabled:opacity-50"
+                      >
+                        {loadingMore ? "Carregando..." : "Carregar mais"}
+                      </button>
+                    </div>
+                  )}
                 </>
               )}
             </div>
@@ -978,6 +1132,14 @@ const handleDeletePost = async (postId) => {
                           <span className="text-[var(--primary-color)] text-sm">Seguindo</span>
                         </div>
                       ))}
+                      {followingNextOffset !== null && user && (
+                        <button
+                          onClick={() => fetchFollowing(user.id, followingNextOffset)}
+                          className="py-2 text-sm font-medium text-[var(--primary-color)]"
+                        >
+                          Carregar mais
+                        </button>
+                      )}
                     </div>
                   )}
                 </div>
@@ -8,6 +8,9 @@ const API_BASE_URL = "https://passa-a-bola.onrender.com";
 
 export default function NextFiapRanking() {
   const [ranking, setRanking] = useState([]);
+  const [resumo, setResumo] = useState(null);
+  const [posicao, setPosicao] = useState(null);
+  const [minhaLinha, setMinhaLinha] = useState(null);
   const [user, setUser] = useState(null);
   const [carregando, setCarregando] = useState(true);
   const [erro, setErro] = useState(null);
@@ -35,14 +38,15 @@ export default function NextFiapRanking() {
 
   useEffect(() => {
     carregarRanking();
-  }, [isClient]);
+  }, [isClient, user]);
 
   const carregarRanking = async () => {
     if (!isClient) return;
 
     try {
       setCarregando(true);
-      const res = await fetch(`${API_BASE_URL}/api/ranking-next-fiap`);
+      // Uma linha por jogadora (melhor pontuação); só a primeira página
+      const res = await fetch(`${API_BASE_URL}/api/ranking-next-fiap/players?limit=100`);
 
       if (!res.ok) throw new Error("Erro no servidor");
 
@@ -51,6 +55,14 @@ export default function NextFiapRanking() {
       if (!data.success) throw new Error("Erro na resposta");
 
       setRanking(data.data || []);
+      setResumo(data.summary || null);
+
+      if (user) {
+        const posRes = await fetch(`${API_BASE_URL}/api/ranking-next-fiap/players/position/${user.id}`);
+        const posData = posRes.ok ? await posRes.json() : null;
+        setPosicao(posData ? posData.position : null);
+        setMinhaLinha(posData ? posData.data : null);
+      }
     } catch (err) {
       setErro("Erro ao carregar ranking");
     } finally {
@@ -102,7 +114,7 @@ export default function NextFiapRanking() {
     console.log('Resposta de sucesso:', data);
 
     
-    setRanking(prevRanking => prevRanking.filter(item => item.user_id !== userId));
+    carregarRanking();
     
     
     setErro(`${userName} excluído do ranking com sucesso!`);
@@ -117,12 +129,14 @@ export default function NextFiapRanking() {
 };
 
   const getPosicaoUsuario = () => {
-    if (!user) return -1;
-    return ranking.findIndex((item) => item.user_id === user.id);
+    if (!user) return null;
+    if (posicao) return posicao;
+    const index = ranking.findIndex((item) => item.user_id === user.id);
+    return index >= 0 ? index + 1 : null;
   };
 
   const usuarioAtual = user
-    ? ranking.find((item) => item.user_id === user.id)
+    ? ranking.find((item) => item.user_id === user.id) || minhaLinha
     : null;
 
   return (
@@ -146,24 +160,24 @@ export default function NextFiapRanking() {
           <div className="grid grid-cols-2 md:grid-cols-4 gap-4 text-center">
             <div className="bg-purple-50 p-3 rounded-lg border border-purple-200">
               <p className="text-sm text-purple-600">Jogadores</p>
-              <p className="text-xl font-bold text-purple-700">{ranking.length}</p>
+              <p className="text-xl font-bold text-purple-700">{resumo ? resumo.players : ranking.length}</p>
             </div>
             <div className="bg-blue-50 p-3 rounded-lg border border-blue-200">
               <p className="text-sm text-blue-600">Total de Acertos</p>
               <p className="text-xl font-bold text-blue-700">
-                {ranking.reduce((sum, player) => sum + (player.acertos || 0), 0)}
+                {resumo ? resumo.total_acertos : ranking.reduce((sum, player) => sum + (player.acertos || 0), 0)}
               </p>
             </div>
             <div className="bg-green-50 p-3 rounded-lg border border-green-200">
               <p className="text-sm text-green-600">Recorde</p>
               <p className="text-xl font-bold text-green-700">
-                {ranking.length > 0 ? Math.max(...ranking.map(p => p.pontos || 0)) : 0} pts
+                {ranking.length > 0 ? ranking[0].pontos || 0 : 0} pts
               </p>
             </div>
             <div className="bg-orange-50 p-3 rounded-lg border border-orange-200">
               <p className="text-sm text-orange-600">Sua Posição</p>
               <p className="text-xl font-bold text-orange-700">
-                {usuarioAtual ? `#${getPosicaoUsuario() + 1}` : "-"}
+                {getPosicaoUsuario() ? `#${getPosicaoUsuario()}` : "-"}
               </p>
             </div>
           </div>
@@ -202,7 +216,7 @@ export default function NextFiapRanking() {
             <div className="space-y-3">
               {ranking.map((player, index) => (
                 <div
-                  key={player.id || index}
+                  key={player.user_id || index}
                   className={`flex items-center justify-between p-4 rounded-lg border-2 transition-all ${
                     index === 0 
                       ? "bg-yellow-50 border-yellow-200 shadow-md" 
@@ -228,7 +242,7 @@ export default function NextFiapRanking() {
                         {player.nome || "Jogador"} {player.user_id === user?.id && "(Você)"}
                       </p>
                       <p className="text-sm text-gray-500">
-                        {(player.acertos || 0)} acertos • {player.created_at ? new Date(player.created_at).toLocaleDateString('pt-BR') : "Data não disponível"}
+                        {(player.acertos || 0)} acertos • {player.attempts || 1} {player.attempts > 1 ? "tentativas" : "tentativa"} • {player.last_played_at ? new Date(player.last_played_at).toLocaleDateString('pt-BR') : "Data não disponível"}
                       </p>
                     </div>
                   </div>
@@ -21,6 +21,8 @@ export default function PerfilPage() {
   const [following, setFollowing] = useState([]);
   const [followersCount, setFollowersCount] = useState(0);
   const [followingCount, setFollowingCount] = useState(0);
+  const [followersNextOffset, setFollowersNextOffset] = useState(null);
+  const [followingNextOffset, setFollowingNextOffset] = useState(null);
   const [showPremiumModal, setShowPremiumModal] = useState(false);
   const [hasPremium, setHasPremium] = useState(false);
   const [likesLoading, setLikesLoading] = useState({});
@@ -52,13 +54,21 @@ export default function PerfilPage() {
     setPostsError(null);
     
     try {
-      const res = await fetch(`${API_BASE_URL}/posts`);
-      
-      if (!res.ok) {
-        throw new Error(`Erro ${res.status}: Não foi possível carregar os posts`);
-      }
-      
-      const data = await res.json();
+      // Só os posts do usuário, seguindo o cursor até a última página
+      const data = [];
+      let cursor = null;
+      do {
+        const url = `${API_BASE_URL}/posts?user_id=${encodeURIComponent(userId)}&limit=100`
+          + (cursor ? `&before=${encodeURIComponent(cursor)}` : "");
+        const res = await fetch(url);
+
+        if (!res.ok) {
+          throw new Error(`Erro ${res.status}: Não foi possível carregar os posts`);
+        }
+
+        data.push(...(await res.json()));
+        cursor = res.headers.get("X-Next-Cursor");
+      } while (cursor);
       
       // Se não há posts, definir array vazio
       if (!data || data.length === 0) {
@@ -67,8 +77,8 @@ export default function PerfilPage() {
         return;
       }
       
-      // Filtrar posts do usuário e processar likes
-      const userPosts = data.filter(post => post.user_id === userId);
+      // Processar likes
+      const userPosts = data;
       
       const postsWithLikes = await Promise.all(
         userPosts.map(async (post) => {
@@ -169,26 +179,31 @@ export default function PerfilPage() {
     }
   };
 
-  const fetchFollowers = async (userId) => {
+  // Listas paginadas: offset > 0 acrescenta a próxima página
+  const fetchFollowers = async (userId, offset = 0) => {
     try {
-      const res = await fetch(`${API_BASE_URL}/user/${userId}/followers`);
+      const res = await fetch(`${API_BASE_URL}/user/${userId}/followers?offset=${offset}`);
       if (res.ok) {
         const data = await res.json();
-        setFollowers(data.followers || []);
-        setFollowersCount(data.followers.length);
+        const page = data.followers || [];
+        setFollowers(prev => offset > 0 ? [...prev, ...page] : page);
+        setFollowersCount(data.count ?? page.length);
+        setFollowersNextOffset(data.next_offset ?? null);
       }
     } catch (error) {
       console.error("Erro ao buscar seguidores:", error);
     }
   };
 
-  const fetchFollowing = async (userId) => {
+  const fetchFollowing = async (userId, offset = 0) => {
     try {
-      const res = await fetch(`${API_BASE_URL}/user/${userId}/following`);
+      const res = await fetch(`${API_BASE_URL}/user/${userId}/following?offset=${offset}`);
       if (res.ok) {
         const data = await res.json();
-        setFollowing(data.following || []);
-        setFollowingCount(data.following.length);
+        const page = data.following || [];
+        setFollowing(prev => offset > 0 ? [...prev, ...page] : page);
+        setFollowingCount(data.count ?? page.length);
+        setFollowingNextOffset(data.next_offset ?? null);
       }
     } catch (error) {
       console.error("Erro ao buscar seguindo:", error);
@@ -486,6 +501,14 @@ export default function PerfilPage() {
                   </div>
                 </div>
               ))}
+              {followersNextOffset !== null && (
+                <button
+                  onClick={() => fetchFollowers(user.id, followersNextOffset)}
+                  className="w-full py-2 text-sm font-medium text-purple-600 hover:text-purple-700"
+                >
+                  Carregar mais
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -529,6 +552,14 @@ export default function PerfilPage() {
                   <span className="text-purple-600 text-sm">Seguindo</span>
                 </div>
               ))}
+              {followingNextOffset !== null && (
+                <button
+                  onClick={() => fetchFollowing(user.id, followingNextOffset)}
+                  className="w-full py-2 text-sm font-medium text-purple-600 hover:text-purple-700"
+                >
+                  Carregar mais
+                </button>
+              )}
             </div>
           )}
         </div>
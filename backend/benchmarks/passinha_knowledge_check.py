@@ -0,0 +1,71 @@
+"""Confere os limites da resposta local da Passinha com perguntas reais.
+
+Roda a partir da pasta backend:
+
+    python -m benchmarks.passinha_knowledge_check
+
+Cada caso diz qual seção deve responder (início do título; do grupo quando a
+resposta é o grupo inteiro) ou None quando a pergunta tem que ir para o
+Gemini. Errar para o lado do Gemini custa uma
+chamada; errar para o lado local entrega uma resposta errada, então os
+casos None são os que mais importam. Sai com código 1 se algum falhar.
+"""
+import sys
+
+from services.passinha_knowledge import passinha_knowledge
+
+
+CASES = [
+    # Têm que escalar: resposta local seria de outra seção
+    ("qual treino antes do jogo", None),
+    ("me da uma dica de treino para goleira", None),
+    ("treino para jogo de domingo", None),
+    ("o que comer antes do treino", None),
+    ("como usar a pagina da comunidade", None),
+    ("quanto de agua devo beber", None),
+    ("onde vejo os jogos ao vivo", None),
+    # Fora do prompt
+    ("quem ganhou a copa do mundo feminina", None),
+    ("qual a melhor chuteira", None),
+    ("estou com dor no joelho o que faço", None),
+    ("qual o melhor time do brasileirao", None),
+    ("dieta para perder peso", None),
+    # Respondidas localmente
+    ("como usar a plataforma", "FUNCIONALIDADES REAIS"),
+    ("como funciona a plataforma", "FUNCIONALIDADES REAIS"),
+    ("treino de força para pernas", "TREINO DE FORÇA"),
+    ("treino tecnico com bola", "TREINO TÉCNICO"),
+    ("treino de resistencia", "TREINO DE RESISTÊNCIA"),
+    ("receita de lanche pre treino", "PANQUECA PRÉ-TREINO"),
+    ("receita de panqueca", "PANQUECA PRÉ-TREINO"),
+    ("receita de vitamina", "VITAMINA RECUPERADORA"),
+    ("sanduiche energetico", "SANDUÍCHE ENERGÉTICO"),
+    ("dicas de hidratacao", "HIDRATAÇÃO"),
+    ("como editar meu perfil", "NO SEU PERFIL"),
+]
+
+
+def run():
+    failures = 0
+    for question, expected in CASES:
+        match = passinha_knowledge._rank(question)
+        local = passinha_knowledge._confident(match)
+        got = None
+        if local:
+            sections = match["sections"]
+            got = sections[0]["group"] if len(sections) > 1 else sections[0]["title"]
+        ok = got.startswith(expected) if expected and got else got is expected
+
+        failures += not ok
+        print(
+            f"{'ok ' if ok else 'ERRO'} {question:<40} esperado={expected or 'Gemini':<22} "
+            f"obtido={(got or 'Gemini')[:22]:<22} score={match['score']:.2f} "
+            f"cobertura={match['coverage']:.2f} relativo={match['relative']:.2f} folga={match['margin']:.2f}"
+        )
+
+    print(f"{len(CASES) - failures}/{len(CASES)} casos ok")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run() else 0)
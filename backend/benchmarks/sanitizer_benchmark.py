@@ -0,0 +1,68 @@
+"""Micro-benchmark do sanitizador de respostas da Passinha.
+
+Roda a partir da pasta backend:
+
+    python -m benchmarks.sanitizer_benchmark [tamanho_em_kb]
+
+Compara a limpeza antiga (quatro str.replace + três re.sub por resposta)
+com services.sanitizer, inteira e em pedaços do tamanho dos do streaming.
+"""
+import re
+import sys
+import timeit
+
+from services.sanitizer import StreamSanitizer, sanitize_response
+
+
+LIST_SAMPLE = """**Treino de força para membros inferiores (2x por semana):**
+
+1. **Agachamento livre:** 3 séries de 12 repetições
+2. **Afundo alternado:** 3 séries de 10 repetições cada perna
+- Elevação pélvica: 3 séries de 15 repetições
+• Panturrilha em pé:   4 séries de 20 repetições
+
+*Dica:* descanse 60 segundos entre as séries e mantenha a postura!
+"""
+
+PROSE_SAMPLE = """O futebol feminino cresceu muito nos últimos anos e hoje tem campeonatos **estaduais**, nacionais e internacionais com cada vez mais público. Para quem está começando, o mais importante é manter a constância nos treinos, cuidar da alimentação e descansar bem entre as sessões, porque é no descanso que o corpo se recupera.
+
+Uma boa semana de treino combina trabalho técnico com bola, força na academia e velocidade no campo, sempre respeitando os limites do corpo e aumentando a carga aos poucos. Converse com a sua *treinadora* sobre os objetivos da temporada e anote a evolução!
+
+"""
+
+
+def legacy_clean(text):
+    text = text.replace('**', '')
+    text = text.replace('*', '')
+    text = text.replace('•', '')
+    text = text.replace('- ', '')
+    text = re.sub(r'^\d+\.\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r' +', ' ', text)
+    return text.strip()
+
+
+def stream_clean(text, chunk_size=64):
+    sanitizer = StreamSanitizer()
+    parts = [sanitizer.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    parts.append(sanitizer.flush())
+    return "".join(parts)
+
+
+def run(size_kb=256, repeat=5):
+    for sample_name, sample in (("lista com markdown", LIST_SAMPLE), ("texto corrido", PROSE_SAMPLE)):
+        text = sample * (size_kb * 1024 // len(sample.encode()) + 1)
+        megabytes = len(text.encode()) / (1024 * 1024)
+
+        print(f"{sample_name}: {megabytes:.2f} MB, melhor de {repeat} execuções")
+        for name, func in (
+            ("legado (replace + re.sub)", legacy_clean),
+            ("sanitize_response", sanitize_response),
+            ("StreamSanitizer (pedaços de 64)", stream_clean),
+        ):
+            seconds = min(timeit.repeat(lambda: func(text), number=1, repeat=repeat))
+            print(f"  {name:<34} {seconds * 1000:8.1f} ms  {megabytes / seconds:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
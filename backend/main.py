@@ -1,43 +1,104 @@
-from fastapi import UploadFile, File, FastAPI, HTTPException
+import time
+_import_started_at = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Request, Response, BackgroundTasks
 from pydantic import BaseModel, EmailStr
-from supabase import create_client, Client
+from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
 from datetime import datetime
 import base64
+import json
 import sys
-import google.generativeai as genai  
-import uuid
 
 
 backend_path = os.path.join(os.path.dirname(__file__))
 if backend_path not in sys.path:
     sys.path.insert(0, backend_path)
 
+from services.admin_stats import admin_stats
+from services.chat_cache import chat_cache
+from services.database import db
+from services.feed_service import feed_service
 from services.football_service_hybrid import football_service
+from services.media_pipeline import media_pipeline
+from services.pagination import DEFAULT_PAGE_SIZE, clamp_limit, keyset_before, next_cursor
 from services.new_service import news_service
+from services.passinha_knowledge import passinha_knowledge
+from services.passinha_service import ChatOverloaded, passinha_service
+from services.ranking_service import ranking_service
+from services.resumable_upload import UploadSessionConflict, resumable_uploads
+from services.sanitizer import StreamSanitizer, sanitize_response
+from services.upload_service import STORAGE_BUCKET, UploadTooLarge, upload_service
 
 
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") 
-STORAGE_BUCKET = "posts-media"
 
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise RuntimeError("SUPABASE_URL e SUPABASE_KEY não estão definidos no .env")
 
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
+if not GEMINI_API_KEY:
     print("⚠️  GEMINI_API_KEY não encontrada - Chatbot não funcionará")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-app = FastAPI()
+
+startup_report = {"import_seconds": None, "steps": {}, "ready_seconds": None}
+
+async def _timed_step(name, coro):
+    started = time.perf_counter()
+    await coro
+    startup_report["steps"][name] = round(time.perf_counter() - started, 3)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_report["import_seconds"] = round(time.perf_counter() - _import_started_at, 3)
+    
+    await _timed_step("database", db.connect())
+    # A checagem da API premium roda em segundo plano; até terminar, servimos mock
+    await _timed_step("football_service", football_service.start())
+    await _timed_step("feed_service", feed_service.start())
+    await _timed_step("news_service", news_service.start())
+    await _timed_step("upload_service", upload_service.start())
+    await _timed_step("media_pipeline", media_pipeline.start())
+    await _timed_step("resumable_uploads", resumable_uploads.start())
+    await _timed_step("ranking_service", ranking_service.start())
+    await _timed_step("admin_stats", admin_stats.start())
+    
+    startup_report["ready_seconds"] = round(time.perf_counter() - _import_started_at, 3)
+    print(f"Startup em {startup_report['ready_seconds']}s (imports {startup_report['import_seconds']}s, etapas {startup_report['steps']})")
+    yield
+    await admin_stats.stop()
+    await ranking_service.stop()
+    await resumable_uploads.stop()
+    await media_pipeline.stop()
+    await upload_service.stop()
+    await news_service.stop()
+    await feed_service.stop()
+    await football_service.close()
+    await db.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Recusa pelo Content-Length antes de receber o corpo do upload"""
+    if request.method == "POST" and request.url.path == "/upload":
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > upload_service.max_request_bytes:
+            return JSONResponse(status_code=413, content={"detail": upload_service.too_large_message()})
+    return await call_next(request)
+
 
 origins = [
     "http://localhost:3000",
@@ -58,6 +119,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 ) 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -80,6 +142,7 @@ class PostCreate(BaseModel):
     user_email: str
     user_name: str
     image: Optional[str] = None
+    image_variants: Optional[dict] = None
     video: Optional[str] = None
 
 class LikeRequest(BaseModel):
@@ -133,6 +196,12 @@ class EventRegistration(BaseModel):
     user_age: Optional[int] = None
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+
 class ChatRequest(BaseModel):
     message: str
     history: List[dict] = []
@@ -142,205 +211,170 @@ class ChatResponse(BaseModel):
     success: bool
 
 
-PASSINHA_SYSTEM_PROMPT = """
-VOCÊ É A PASSINHA - ASSISTENTE VIRTUAL DA PLATAFORMA "PASSA BOLA"
-
-SUA PERSONALIDADE:
-- Você é motivadora, encorajadora e especialista em futebol feminino
-- Fala de forma clara, direta e natural, como uma treinadora experiente
-- É prestativa e sempre oferece ajuda concreta
-
-SUAS FUNÇÕES PRINCIPAIS:
-1. Tirar dúvidas sobre como usar a plataforma Passa Bola
-2. Dar exemplos práticos de rotinas de treino para jogadoras
-3. Ensinar receitas nutritivas para atletas do futebol feminino
-4. Falar sobre futebol feminino
-5. Dar dicas de nutrição esportiva específicas para mulheres atletas
-
-REGRAS IMPORTANTES:
-- NUNCA use asteriscos, markdown, negrito, itálico ou qualquer formatação
-- NUNCA invente funcionalidades que não existem na plataforma
-- Use linguagem natural e conversacional
-- Responda sempre em português claro e direto
-
-FUNCIONALIDADES REAIS DA PLATAFORMA:
-
-NA PÁGINA PRINCIPAL (ícone da casa):
-Você vê jogos ao vivo, próximas partidas e as últimas notícias do futebol feminino. Clique em qualquer jogo para ver detalhes completos e estatísticas.
-
-NA SEÇÃO DE EVENTOS (ícone do troféu):
-Encontre peneiras, torneios e competições. Veja o calendário completo de eventos, filtre por cidade e data. Ao clicar em um evento, você vê todos os detalhes como local, regras e número de vagas.
-
-NA COMUNIDADE (ícone das pessoas):
-Compartilhe seus lances, fotos e vídeos. Clique no botão "+" no topo da tela para criar posts e interagir com outras atletas.
-
-NO SEU PERFIL (ícone da pessoa):
-Seu perfil é seu portfólio digital. Acesse para editar suas informações, adicionar fotos e ver todos os posts que já fez.
-
-ROTINAS DE TREINO PARA JOGADORAS:
-
-TREINO DE FORÇA PARA MEMBROS INFERIORES (2x por semana):
-Agachamento livre 4 séries de 8-12 repetições
-Afundos com halteres 3 séries de 10-12 repetições por perna
-Elevação pélvica 4 séries de 12-15 repetições
-Cadeira extensora e flexora 3 séries de 12-15 repetições
-
-TREINO TÉCNICO DE FUTEBOL (3x por semana):
-Domínio de bola com ambas as pernas - 15 minutos
-Passe curto e longo - 20 minutos
-Finalização a gol - 15 minutos
-Condução de bola em zigue-zague - 10 minutos
-
-TREINO DE VELOCIDADE E AGILIDADE (2x por semana):
-Sprints de 20-30 metros - 8-10 repetições
-Exercícios de escada de agilidade - 15 minutos
-Mudanças de direção rápidas - 10 minutos
-Pliometria (saltos) - 12 minutos
-
-TREINO DE RESISTÊNCIA (1-2x por semana):
-Corridas intervaladas - 30 segundos rápido, 1 minuto lento
-Fartlek - variação de ritmo durante 30-40 minutos
-Corrida contínua em ritmo moderado - 25-35 minutos
-
-DICAS DE NUTRIÇÃO PARA ATLETAS:
-
-PRÉ-TREINO (1-2 horas antes):
-Panqueca proteica com aveia e banana
-Sanduíche de pão integral com frango e queijo
-Vitamina de banana com aveia e whey protein
-Iogurte natural com granola e mel
-
-PÓS-TREINO (até 30 minutos após):
-Sanduíche de pão integral com atum e queijo
-Vitamina de banana com whey protein e aveia
-Iogurte grego com frutas e mel
-Omelete com 2 ovos e pão integral
-
-RECEITAS PRÁTICAS:
-
-PANQUECA PRÉ-TREINO:
-2 colheres de aveia
-1 ovo
-1 banana amassada
-1 colher de whey protein (opcional)
-Misture tudo e faça na frigideira antiaderente
-
-VITAMINA RECUPERADORA:
-1 banana
-200ml de leite ou bebida vegetal
-1 colher de whey protein
-1 colher de aveia
-1 colher de mel
-Bata tudo no liquidificador
-
-SANDUÍCHE ENERGÉTICO:
-2 fatias de pão integral
-100g de peito de frango desfiado
-1 fatia de queijo branco
-Alface e tomate
-Pode adicionar abacate para gorduras boas
-
-HIDRATAÇÃO:
-Beba água durante todo o dia
-Durante treinos longos, use bebida isotônica caseira (água, sal, mel e limão)
-Após treino, reponha líquidos imediatamente
-
-Lembre-se: sou aqui para te ajudar de forma prática e direta!
-"""
+
+def fallback_response(message):
+    """Resposta pronta usada quando o Gemini falha"""
+    user_msg = message.lower()
+    
+    # Respostas específicas para treino e nutrição
+    if any(word in user_msg for word in ['treino', 'exercício', 'treinar', 'prática']):
+        return "Olá! Vamos falar de treino?\n\nPara jogadoras, recomendo:\n\nTreino de força 2x por semana com agachamentos, afundos e elevação pélvica.\n\nTreino técnico 3x por semana focado em domínio, passe e finalização.\n\nTreino de velocidade 2x por semana com sprints e exercícios de agilidade.\n\nE não esqueça do descanso! O corpo se fortalece quando descansa.\n\nQual tipo de treino te interessa mais?"
+    
+    elif any(word in user_msg for word in ['comida', 'alimentação', 'nutrição', 'dieta', 'receita']):
+        return "Que bom que se preocupa com a nutrição!\n\nPara pré-treino: panqueca de aveia com banana ou sanduíche integral com frango.\n\nPara pós-treino: vitamina de banana com whey ou iogurte grego com frutas.\n\nHidratação é fundamental: beba água o dia todo e use isotônico caseiro em treinos longos.\n\nQuer uma receita específica ou dica de algum momento do treino?"
+    
+    elif any(word in user_msg for word in ['plataforma', 'app', 'como funciona', 'como usar', 'dicas']):
+        return "Olá! Que bom que quer explorar a plataforma!\n\nAqui estão as principais funcionalidades do Passa Bola:\n\nNa Página Principal você vê jogos ao vivo, próximas partidas e as últimas notícias do futebol feminino.\n\nNos Eventos encontra peneiras e competições. É só clicar no evento para ver detalhes e se inscrever.\n\nNa Comunidade pode compartilhar seus lances clicando no + e fazendo posts com fotos e vídeos.\n\nNo seu Perfil edita suas informações e vê todos os posts que já fez.\n\nQual parte te interessa mais? Posso explicar melhor!"
+    
+    else:
+        return "Olá! Sou a Passinha, sua assistente do Passa Bola!\n\nPosso te ajudar com:\nDúvidas sobre a plataforma\nRotinas de treino para jogadoras\nReceitas e nutrição para atletas\nInformações sobre futebol feminino\n\nO que você precisa hoje?"
+
+
+def hedged_response(message):
+    """Melhor resposta local quando o Gemini não responde: seção do prompt ou resposta pronta"""
+    return passinha_knowledge.best_effort(message) or fallback_response(message)
+
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat_with_passinha(request: ChatRequest):
 
     print(f"💬 Mensagem: {request.message}")
     
+    # Perguntas sobre a plataforma, treinos e receitas saem direto do prompt
+    local_tier = not passinha_service.has_user_turns(request.history)
+    if local_tier:
+        local = passinha_knowledge.answer(request.message)
+        if local:
+            return ChatResponse(response=local, success=True)
+    
     if not GEMINI_API_KEY:
         return ChatResponse(
             response="Estou em ajustes técnicos! Volte em alguns instantes.",
             success=False
         )
     
+    # Perguntas sem histórico repetem muito: responde do cache sem chamar o Gemini.
+    # Só a saudação do bot no histórico não conta como contexto.
+    use_cache = local_tier
+    if use_cache:
+        cached = chat_cache.get(request.message)
+        if cached:
+            return ChatResponse(response=cached, success=True)
+    
     try:
-        model = genai.GenerativeModel('models/gemini-2.0-flash-001')
-        
-        final_prompt = f"""
-        {PASSINHA_SYSTEM_PROMPT}
+        model = await passinha_service.get_model()
         
-        PERGUNTA DO USUÁRIO: {request.message}
-        
-        INSTRUÇÕES FINAIS E OBRIGATÓRIAS:
-        - Responda como a Passinha, de forma natural e conversacional
-        - USE APENAS LINGUAGEM NATURAL SEM FORMATAÇÃO
-        - NUNCA use: *, **, -, •, markdown, emojis excessivos ou qualquer formatação
-        - NUNCA invente funcionalidades
-        - Seja direta e prática
-        - Use parágrafos simples com quebras de linha normais
-        - Mantenha o foco nas funcionalidades reais da plataforma
-        - Se não souber algo, diga que vai verificar ou sugira algo relacionado que sabe
-        
-        SUA RESPOSTA DEVE SER:
-        Natural, clara, sem formatação, em português, focada em ajudar.
-        
-        AGORA RESPONDA:
-        """
-        
-        response = model.generate_content(final_prompt)
+        contents = passinha_service.build_contents(request.history, request.message)
+        text = await passinha_service.generate(model, contents)
         
         # LIMPEZA DA RESPOSTA - Remove markdown e formatação
-        cleaned_response = clean_response_text(response.text)
+        cleaned_response = sanitize_response(text)
+        
+        if use_cache:
+            chat_cache.set(request.message, cleaned_response)
         
         return ChatResponse(response=cleaned_response, success=True)
+    
+    except ChatOverloaded as e:
+        # Fila cheia, Gemini lento ou circuito aberto: responde na hora com o que temos local
+        print(f"⚠️ Chat sobrecarregado: {e}")
+        return ChatResponse(response=hedged_response(request.message), success=False)
         
     except Exception as e:
         print(f"❌ Erro no chat: {e}")
-        
-        user_msg = request.message.lower()
-        
-        # Respostas específicas para treino e nutrição
-        if any(word in user_msg for word in ['treino', 'exercício', 'treinar', 'prática']):
-            return ChatResponse(
-                response="Olá! Vamos falar de treino?\n\nPara jogadoras, recomendo:\n\nTreino de força 2x por semana com agachamentos, afundos e elevação pélvica.\n\nTreino técnico 3x por semana focado em domínio, passe e finalização.\n\nTreino de velocidade 2x por semana com sprints e exercícios de agilidade.\n\nE não esqueça do descanso! O corpo se fortalece quando descansa.\n\nQual tipo de treino te interessa mais?",
-                success=True
-            )
-        
-        elif any(word in user_msg for word in ['comida', 'alimentação', 'nutrição', 'dieta', 'receita']):
-            return ChatResponse(
-                response="Que bom que se preocupa com a nutrição!\n\nPara pré-treino: panqueca de aveia com banana ou sanduíche integral com frango.\n\nPara pós-treino: vitamina de banana com whey ou iogurte grego com frutas.\n\nHidratação é fundamental: beba água o dia todo e use isotônico caseiro em treinos longos.\n\nQuer uma receita específica ou dica de algum momento do treino?",
-                success=True
-            )
-        
-        elif any(word in user_msg for word in ['plataforma', 'app', 'como funciona', 'como usar', 'dicas']):
-            return ChatResponse(
-                response="Olá! Que bom que quer explorar a plataforma!\n\nAqui estão as principais funcionalidades do Passa Bola:\n\nNa Página Principal você vê jogos ao vivo, próximas partidas e as últimas notícias do futebol feminino.\n\nNos Eventos encontra peneiras e competições. É só clicar no evento para ver detalhes e se inscrever.\n\nNa Comunidade pode compartilhar seus lances clicando no + e fazendo posts com fotos e vídeos.\n\nNo seu Perfil edita suas informações e vê todos os posts que já fez.\n\nQual parte te interessa mais? Posso explicar melhor!",
-                success=True
-            )
-        
-        else:
-            return ChatResponse(
-                response="Olá! Sou a Passinha, sua assistente do Passa Bola!\n\nPosso te ajudar com:\nDúvidas sobre a plataforma\nRotinas de treino para jogadoras\nReceitas e nutrição para atletas\nInformações sobre futebol feminino\n\nO que você precisa hoje?",
-                success=True
-            )
+        return ChatResponse(response=hedged_response(request.message), success=True)
+
+
+def _sse(payload):
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
 
 
-#FUNÇÃO PARA LIMPAR A RESPOSTA DO GEMINI
-def clean_response_text(text):
-    if not text:
-        return "Desculpe, não consegui processar sua pergunta. Pode reformular?"
+async def _stream_passinha(message, history, use_cache):
+    """Gera eventos SSE: {"delta": texto} a cada trecho limpo e {"done": true} no fim."""
+    if use_cache:
+        local = passinha_knowledge.answer(message)
+        if local:
+            yield _sse({"delta": local})
+            yield _sse({"done": True, "success": True})
+            return
     
-    text = text.replace('**', '')
-    text = text.replace('*', '')
-    text = text.replace('•', '')
-    text = text.replace('- ', '')
+    if not GEMINI_API_KEY:
+        yield _sse({"delta": "Estou em ajustes técnicos! Volte em alguns instantes."})
+        yield _sse({"done": True, "success": False})
+        return
+    
+    if use_cache:
+        cached = chat_cache.get(message)
+        if cached:
+            yield _sse({"delta": cached})
+            yield _sse({"done": True, "success": True})
+            return
     
-    import re
-    text = re.sub(r'^\d+\.\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    text = re.sub(r' +', ' ', text)
-    text = text.strip()
+    cleaner = StreamSanitizer()
+    sent_any = False
+    streamed = []
     
-    if not text or len(text) < 10:
-        return "Olá! Sou a Passinha. Posso te ajudar com dúvidas sobre a plataforma, treinos ou receitas para atletas. O que você gostaria de saber?"
+    try:
+        model = await passinha_service.get_model()
+        
+        contents = passinha_service.build_contents(history, message)
+        async for chunk_text in passinha_service.stream(model, contents):
+            text = cleaner.feed(chunk_text)
+            if text:
+                sent_any = True
+                streamed.append(text)
+                yield _sse({"delta": text})
+        
+        text = cleaner.flush()
+        if text:
+            sent_any = True
+            streamed.append(text)
+            yield _sse({"delta": text})
+        
+        if not sent_any:
+            yield _sse({"delta": sanitize_response("")})
+        elif use_cache:
+            chat_cache.set(message, "".join(streamed))
+        
+        yield _sse({"done": True, "success": True})
     
-    return text
+    except ChatOverloaded as e:
+        print(f"⚠️ Chat sobrecarregado (stream): {e}")
+        yield _sse({"delta": hedged_response(message)})
+        yield _sse({"done": True, "success": False})
+        
+    except Exception as e:
+        print(f"❌ Erro no chat (stream): {e}")
+        if not sent_any:
+            yield _sse({"delta": hedged_response(message)})
+        yield _sse({"done": True, "success": True})
+
+
+@app.post("/api/chat/stream")
+async def chat_with_passinha_stream(request: ChatRequest):
+    """Versão em streaming (Server-Sent Events) do /api/chat"""
+    print(f"💬 Mensagem (stream): {request.message}")
+    
+    return StreamingResponse(
+        _stream_passinha(
+            request.message,
+            request.history,
+            use_cache=not passinha_service.has_user_turns(request.history)
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/chat/stats")
+async def get_chat_stats():
+    return {
+        "cache": chat_cache.stats(),
+        "local": passinha_knowledge.stats(),
+        "concurrency": passinha_service.concurrency_stats(),
+        "resilience": passinha_service.resilience_stats()
+    }
+
 
 # Rotas para o ranking do NEXT FIAP
 @app.post("/api/ranking-next-fiap")
@@ -348,7 +382,7 @@ async def add_to_ranking_next_fiap(ranking_data: dict):
     """Adiciona pontuação ao ranking do NEXT FIAP"""
     try:
         # Verificar se o usuário existe
-        user_result = supabase.table("users").select("id, name").eq("id", ranking_data.get("user_id")).execute()
+        user_result = await db.table("users").select("id, name").eq("id", ranking_data.get("user_id")).execute()
         if not user_result.data:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
@@ -362,10 +396,12 @@ async def add_to_ranking_next_fiap(ranking_data: dict):
         }
 
         # Inserir no ranking
-        result = supabase.table("ranking_next_fiap").insert(insert_data).execute()
+        result = await db.table("ranking_next_fiap").insert(insert_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=400, detail="Erro ao salvar no ranking")
+
+        await ranking_service.add(result.data[0])
             
         return {
             "success": True,
@@ -385,10 +421,12 @@ async def delete_from_ranking(user_id: str):
    
     try:
         
-        result = supabase.table("ranking_next_fiap")\
+        result = await db.table("ranking_next_fiap")\
             .delete()\
             .eq("user_id", user_id)\
             .execute()
+
+        await ranking_service.remove_user(user_id)
         
         if not result.data:
             
@@ -407,29 +445,145 @@ async def delete_from_ranking(user_id: str):
         raise HTTPException(status_code=500, detail=f"Erro ao excluir do ranking: {str(e)}")
 
 @app.get("/api/ranking-next-fiap")
-async def get_ranking_next_fiap():
-    
+async def get_ranking_next_fiap(limit: int = DEFAULT_PAGE_SIZE, offset: int = 0):
+    """Uma página do ranking ordenado (limit/offset, no máximo MAX_PAGE_SIZE linhas)."""
     try:
-        result = supabase.table("ranking_next_fiap")\
-            .select("*")\
-            .order("pontos", desc=True)\
-            .order("created_at", desc=True)\
-            .execute()
-        
+        limit = clamp_limit(limit)
+        offset = max(offset, 0)
+
+        if ranking_service.ready:
+            total = ranking_service.count()
+            data = ranking_service.page(offset, limit)
+        else:
+            # Índice ainda não carregado: consulta direto na tabela
+            query = db.table("ranking_next_fiap")\
+                .select("*", count="exact")\
+                .order("pontos", desc=True)\
+                .order("created_at", desc=True)\
+                .order("id")\
+                .range(offset, offset + limit - 1)
+            result = await query.execute()
+            data = result.data or []
+            total = result.count if result.count is not None else len(data)
+
         return {
             "success": True,
-            "data": result.data,
-            "count": len(result.data)
+            "data": data,
+            "count": len(data),
+            "total": total,
+            "next_offset": offset + limit if offset + limit < total else None
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar ranking: {str(e)}")
 
+@app.get("/api/ranking-next-fiap/position/{user_id}")
+async def get_ranking_position(user_id: str):
+    """Posição da melhor pontuação de um usuário no ranking."""
+    if not ranking_service.ready:
+        raise HTTPException(status_code=503, detail="Ranking ainda está sendo carregado")
+
+    found = ranking_service.position(user_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Usuário não está no ranking")
+
+    position, best = found
+    return {
+        "success": True,
+        "position": position,
+        "total": ranking_service.count(),
+        "data": best
+    }
+
+PLAYERS_TABLE = "ranking_next_fiap_players"
+
+@app.get("/api/ranking-next-fiap/players")
+async def get_ranking_players(limit: int = DEFAULT_PAGE_SIZE, offset: int = 0):
+    """Ranking com uma linha por usuário: melhor pontuação, tentativas e última jogada.
+
+    Lido da tabela agregada pelo trigger, na ordem do índice
+    (pontos desc, best_at desc, user_id); o resumo é a função
+    ranking_players_summary (sql/011) sobre a mesma tabela.
+    """
+    try:
+        limit = clamp_limit(limit)
+        offset = max(offset, 0)
+
+        # Página e resumo vêm da mesma tabela, qualquer que seja a instância
+        result, totals = await asyncio.gather(
+            db.table(PLAYERS_TABLE)\
+                .select("*", count="exact")\
+                .order("pontos", desc=True)\
+                .order("best_at", desc=True)\
+                .order("user_id")\
+                .range(offset, offset + limit - 1)\
+                .execute(),
+            db.rpc("ranking_players_summary").execute()
+        )
+        data = result.data or []
+        total = result.count or 0
+        summary = totals.data[0] if totals.data else None
+
+        return {
+            "success": True,
+            "data": data,
+            "count": len(data),
+            "total": total,
+            "next_offset": offset + limit if offset + limit < total else None,
+            "summary": summary
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar ranking: {str(e)}")
+
+@app.get("/api/ranking-next-fiap/players/position/{user_id}")
+async def get_ranking_player_position(user_id: str):
+    """Posição de um usuário no ranking por jogadora."""
+    try:
+        result = await db.table(PLAYERS_TABLE).select("*").eq("user_id", user_id).execute()
+        if not result.data:
+            raise HTTPException(status_code=404, detail="Usuário não está no ranking")
+        player = result.data[0]
+
+        # Quantas jogadoras vêm antes na mesma ordem do GET /players
+        pontos, best_at = player["pontos"], player["best_at"]
+        ahead, total = await asyncio.gather(
+            db.table(PLAYERS_TABLE)\
+                .select("user_id", count="exact", head=True)\
+                .or_(
+                    f'pontos.gt.{pontos},'
+                    f'and(pontos.eq.{pontos},best_at.gt."{best_at}"),'
+                    f'and(pontos.eq.{pontos},best_at.eq."{best_at}",user_id.lt.{user_id})'
+                )\
+                .execute(),
+            db.table(PLAYERS_TABLE).select("user_id", count="exact", head=True).execute()
+        )
+
+        return {
+            "success": True,
+            "position": (ahead.count or 0) + 1,
+            "total": total.count or 0,
+            "data": player
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar posição no ranking: {str(e)}")
+
 @app.get("/api/ranking-next-fiap/user/{user_id}")
 async def get_user_ranking(user_id: str):
     """Busca as pontuações de um usuário específico"""
     try:
-        result = supabase.table("ranking_next_fiap")\
+        if ranking_service.ready:
+            data = ranking_service.user_rows(user_id)
+            return {
+                "success": True,
+                "data": data,
+                "count": len(data)
+            }
+
+        result = await db.table("ranking_next_fiap")\
             .select("*")\
             .eq("user_id", user_id)\
             .order("pontos", desc=True)\
@@ -447,15 +601,15 @@ async def get_user_ranking(user_id: str):
 
 # Rotas de autenticação
 @app.post("/register")
-def register(user: User):
+async def register(user: User):
     try:
         # Verificar se email já existe
-        existing_email = supabase.table("users").select("*").eq("email", user.email).execute()
+        existing_email = await db.table("users").select("*").eq("email", user.email).execute()
         if existing_email.data:
             raise HTTPException(status_code=400, detail="Email já registrado.")
 
         # Verificar se username já existe
-        existing_username = supabase.table("users").select("*").eq("username", user.username).execute()
+        existing_username = await db.table("users").select("*").eq("username", user.username).execute()
         if existing_username.data:
             raise HTTPException(status_code=400, detail="Username já está em uso.")
 
@@ -467,9 +621,9 @@ def register(user: User):
                 detail="Username inválido. Use apenas letras minúsculas, números e _ (3-20 caracteres)"
             )
 
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = await asyncio.to_thread(pwd_context.hash, user.password)
 
-        res = supabase.table("users").insert({
+        res = await db.table("users").insert({
             "name": user.name,
             "email": user.email,
             "username": user.username,
@@ -482,15 +636,15 @@ def register(user: User):
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.post("/login")
-def login(data: LoginData):
+async def login(data: LoginData):
     try:
-        result = supabase.table("users").select("*").eq("email", data.email).execute()
+        result = await db.table("users").select("*").eq("email", data.email).execute()
         user = result.data[0] if result.data else None
 
         if not user:
             raise HTTPException(status_code=400, detail="Email ou senha inválidos.")
 
-        if not pwd_context.verify(data.password, user["password"]):
+        if not await asyncio.to_thread(pwd_context.verify, data.password, user["password"]):
             raise HTTPException(status_code=400, detail="Email ou senha inválidos.")
 
         user.pop("password", None)
@@ -499,54 +653,24 @@ def login(data: LoginData):
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
     
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(request: Request):
     """
-    Upload de arquivos para Supabase Storage
+    Upload de arquivos para Supabase Storage (multipart, campo "file")
     """
     try:
-        # Validar tipo de arquivo
-        if not file.content_type.startswith(('image/', 'video/')):
-            raise HTTPException(
-                status_code=400, 
-                detail="Apenas imagens e vídeos são permitidos"
-            )
-
-        # Validar tamanho do arquivo (50MB máximo)
-        max_size = 50 * 1024 * 1024  # 50MB
-        file_content = await file.read()
-        if len(file_content) > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail="Arquivo muito grande. Máximo 50MB permitido."
-            )
-
-        # Gerar nome único para o arquivo
-        file_extension = file.filename.split('.')[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        
-        # Fazer upload para Supabase Storage
-        upload_result = supabase.storage.from_(STORAGE_BUCKET).upload(
-            unique_filename,
-            file_content,
-            {"content-type": file.content_type}
+        # O corpo é lido da rede em streaming: o tipo (só imagens e vídeos) e
+        # o limite de tamanho são checados enquanto chega. Imagens ganham
+        # variantes WebP geradas em segundo plano
+        return await upload_service.upload(
+            request,
+            accepts=media_pipeline.accepts,
+            process=media_pipeline.process
         )
         
-        if not upload_result:
-            raise HTTPException(
-                status_code=500,
-                detail="Erro ao fazer upload para o storage"
-            )
-        
-        # Obter URL pública do arquivo
-        file_url = supabase.storage.from_(STORAGE_BUCKET).get_public_url(unique_filename)
-        
-        return {
-            "success": True,
-            "url": file_url,
-            "filename": unique_filename,
-            "type": file.content_type.split('/')[0]  # 'image' ou 'video'
-        }
-        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -562,7 +686,7 @@ async def delete_file(filename: str):
     Deletar arquivo do Supabase Storage
     """
     try:
-        result = supabase.storage.from_(STORAGE_BUCKET).remove([filename])
+        result = await db.storage.from_(STORAGE_BUCKET).remove([filename] + media_pipeline.variant_paths(filename))
         return {"success": True, "message": "Arquivo deletado"}
     except Exception as e:
         raise HTTPException(
@@ -571,16 +695,95 @@ async def delete_file(filename: str):
         )
 
 
+# Upload retomável de vídeos: cria a sessão, envia os pedaços (PUT, um de
+# cada vez e em ordem: o TUS do storage só aceita o próximo offset, fora de
+# ordem é 409) e finaliza. GET na sessão diz de qual pedaço continuar.
+@app.post("/uploads/sessions")
+async def create_upload_session(data: UploadSessionCreate):
+    try:
+        return await resumable_uploads.create(data.filename, data.content_type, data.size)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao criar sessão de upload: {str(e)}")
+
+
+@app.get("/uploads/sessions/{session_id}")
+async def get_upload_session(session_id: str):
+    try:
+        return await resumable_uploads.get(session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar sessão de upload: {str(e)}")
+
+
+@app.put("/uploads/sessions/{session_id}/chunks/{index}")
+async def put_upload_chunk(session_id: str, index: int, request: Request):
+    """Corpo cru do pedaço, em ordem; vai em streaming direto para o upload TUS no storage"""
+    content_length = request.headers.get("content-length", "")
+    if not content_length.isdigit():
+        raise HTTPException(status_code=411, detail="Content-Length obrigatório")
+
+    try:
+        return await resumable_uploads.put_chunk(session_id, index, request.stream(), int(content_length))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadSessionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao gravar pedaço: {str(e)}")
+
+
+@app.post("/uploads/sessions/{session_id}/complete")
+async def complete_upload_session(session_id: str):
+    try:
+        return await resumable_uploads.complete(session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao finalizar upload: {str(e)}")
+
+
+@app.delete("/uploads/sessions/{session_id}")
+async def abort_upload_session(session_id: str):
+    try:
+        await resumable_uploads.abort(session_id)
+        return {"success": True, "message": "Sessão de upload cancelada"}
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadSessionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao cancelar upload: {str(e)}")
+
+
+@app.get("/upload/{filename}/variants")
+async def get_file_variants(filename: str):
+    """Estado das variantes WebP de uma imagem enviada"""
+    status = media_pipeline.status(filename)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Nenhum processamento encontrado para este arquivo")
+    return {"filename": filename, "variants": status}
+
+
 @app.get("/api/noticias")
 async def get_noticias(limit: int = 6):
     """Endpoint para obter notícias de futebol feminino"""
     try:
-        noticias = news_service.get_news(limit)
+        noticias = await news_service.get_news(limit)
         return {
             "success": True,
             "noticias": noticias,
             "total": len(noticias),
-            "source": "api" if len(noticias) > 0 and noticias[0].get("id", 0) > 3 else "fallback"
+            "source": "api" if len(noticias) > 0 and noticias[0].get("id", 0) > 3 else "fallback",
+            "cache_age_seconds": news_service.cache_age()
         }
     except Exception as e:
         return {
@@ -590,9 +793,14 @@ async def get_noticias(limit: int = 6):
             "source": "error"
         }
 
+@app.get("/api/noticias/status")
+async def get_noticias_status():
+    """Estatísticas de busca de cada feed RSS (sucessos, 304, falhas e latência)"""
+    return news_service.get_stats()
+
 # Rotas para posts
 @app.post("/posts")
-def create_post(post: PostCreate):
+async def create_post(post: PostCreate, background_tasks: BackgroundTasks):
     try:
         # Preparar dados para inserção
         post_data = {
@@ -602,33 +810,74 @@ def create_post(post: PostCreate):
             "user_name": post.user_name,
             "likes_count": 0,
             "image": post.image,
+            "image_variants": post.image_variants,
             "video": post.video  # ADICIONE ESTA LINHA
         }
         
         # Remover campos None para não enviar dados desnecessários
         post_data = {k: v for k, v in post_data.items() if v is not None}
         
-        result = supabase.table("posts").insert(post_data).execute()
+        result = await db.table("posts").insert(post_data).execute()
         
         if not result.data:
             raise HTTPException(status_code=400, detail="Erro ao criar post")
+        
+        # Distribui o post para as timelines das seguidoras depois da resposta
+        background_tasks.add_task(feed_service.fan_out, result.data[0])
             
         return result.data[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+@app.get("/feed/{user_id}")
+async def get_feed(user_id: str, response: Response, limit: int = DEFAULT_PAGE_SIZE, before: Optional[str] = None):
+    """Timeline com os posts de quem o usuário segue, paginada como GET /posts."""
+    try:
+        posts, cursor = await feed_service.get_feed(user_id, limit, before)
+        if cursor:
+            response.headers["X-Next-Cursor"] = cursor
+        return posts
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao buscar feed: {str(e)}")
+
 @app.get("/posts")
-def get_posts():
+async def get_posts(response: Response, limit: int = DEFAULT_PAGE_SIZE, before: Optional[str] = None, user_id: Optional[str] = None):
+    """Lista posts do mais novo para o mais antigo, paginado por cursor.
+
+    O cursor da próxima página volta no header X-Next-Cursor (ausente na última
+    página) e deve ser enviado em `before` na chamada seguinte. Com `user_id`,
+    lista só os posts dessa usuária, com o mesmo cursor.
+    """
     try:
-        result = supabase.table("posts").select("*").order("created_at", desc=True).execute()
-        return result.data
+        limit = clamp_limit(limit)
+        query = db.table("posts").select("*")
+        if user_id:
+            query = query.eq("user_id", user_id)
+        
+        if before:
+            query = keyset_before(query, before)
+        
+        result = await query\
+            .order("created_at", desc=True)\
+            .order("id", desc=True)\
+            .limit(limit + 1)\
+            .execute()
+        
+        posts, cursor = next_cursor(result.data or [], limit)
+        if cursor:
+            response.headers["X-Next-Cursor"] = cursor
+        return posts
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar posts: {str(e)}")
 
 @app.get("/posts/{post_id}")
-def get_post(post_id: str):
+async def get_post(post_id: str):
     try:
-        result = supabase.table("posts").select("*").eq("id", post_id).execute()
+        result = await db.table("posts").select("*").eq("id", post_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Post não encontrado")
         return result.data[0]
@@ -636,53 +885,46 @@ def get_post(post_id: str):
         raise HTTPException(status_code=500, detail=f"Erro ao buscar post: {str(e)}")
 
 @app.get("/posts/{post_id}/likes")
-def get_post_likes(post_id: str):
+async def get_post_likes(post_id: str):
     try:
-        result = supabase.table("post_likes").select("user_id").eq("post_id", post_id).execute()
+        result = await db.table("post_likes").select("user_id").eq("post_id", post_id).execute()
         return {"likes": [like["user_id"] for like in result.data]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar likes: {str(e)}")
 
 @app.post("/posts/like")
-def toggle_like(like: LikeRequest):
+async def toggle_like(like: LikeRequest):
+    """Curte/descurte um post em uma única chamada atômica ao banco.
+
+    A função toggle_post_like (backend/sql/001_toggle_post_like.sql) troca o
+    estado do like e ajusta posts.likes_count na mesma transação.
+    """
     try:
-        existing_like = supabase.table("post_likes").select("*").eq("post_id", like.post_id).eq("user_id", like.user_id).execute()
-        
-        if existing_like.data:
-            supabase.table("post_likes").delete().eq("post_id", like.post_id).eq("user_id", like.user_id).execute()
-            current_post = supabase.table("posts").select("likes_count").eq("id", like.post_id).execute()
-            if current_post.data:
-                new_count = current_post.data[0]["likes_count"] - 1
-                supabase.table("posts").update({"likes_count": new_count}).eq("id", like.post_id).execute()
-            action = "removed"
-        else:
-            supabase.table("post_likes").insert({
-                "post_id": like.post_id,
-                "user_id": like.user_id
-            }).execute()
-            current_post = supabase.table("posts").select("likes_count").eq("id", like.post_id).execute()
-            if current_post.data:
-                new_count = current_post.data[0]["likes_count"] + 1
-                supabase.table("posts").update({"likes_count": new_count}).eq("id", like.post_id).execute()
-            action = "added"
-        
-        likes_result = supabase.table("post_likes").select("user_id").eq("post_id", like.post_id).execute()
-        liked_users = [like["user_id"] for like in likes_result.data] if likes_result.data else []
-        
-        updated_post = supabase.table("posts").select("*").eq("id", like.post_id).execute()
+        result = await db.rpc("toggle_post_like", {
+            "p_post_id": like.post_id,
+            "p_user_id": like.user_id
+        }).execute()
+        
+        state = result.data or {}
+        if state.get("likes_count") is None:
+            raise HTTPException(status_code=404, detail="Post não encontrado")
+        
         return {
-            "action": action, 
-            "post": updated_post.data[0] if updated_post.data else None,
-            "liked_users": liked_users
+            "action": "added" if state["liked"] else "removed",
+            "liked": state["liked"],
+            "likes_count": state["likes_count"],
+            "post": {"id": like.post_id, "likes_count": state["likes_count"]}
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao processar like: {str(e)}")
 
 @app.put("/posts/{post_id}")
-def update_post(post_id: str, post_update: PostUpdate):
+async def update_post(post_id: str, post_update: PostUpdate):
     try:
-        result = supabase.table("posts").update({
+        result = await db.table("posts").update({
             "content": post_update.content
         }).eq("id", post_id).execute()
         
@@ -694,14 +936,14 @@ def update_post(post_id: str, post_update: PostUpdate):
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar post: {str(e)}")
 
 @app.delete("/posts/{post_id}")
-def delete_post(post_id: str):
+async def delete_post(post_id: str):
     try:
         # Primeiro deletar comentários e likes associados
-        supabase.table("comments").delete().eq("post_id", post_id).execute()
-        supabase.table("post_likes").delete().eq("post_id", post_id).execute()
+        await db.table("comments").delete().eq("post_id", post_id).execute()
+        await db.table("post_likes").delete().eq("post_id", post_id).execute()
         
         # Depois deletar o post
-        result = supabase.table("posts").delete().eq("id", post_id).execute()
+        result = await db.table("posts").delete().eq("id", post_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Post não encontrado")
@@ -712,16 +954,16 @@ def delete_post(post_id: str):
 
 # NOVO: Rotas para comentários
 @app.post("/comments")
-def create_comment(comment: CommentCreate):
+async def create_comment(comment: CommentCreate):
     try:
         # Buscar informações do usuário
-        user_result = supabase.table("users").select("name, avatar").eq("id", comment.user_id).execute()
+        user_result = await db.table("users").select("name, avatar").eq("id", comment.user_id).execute()
         if not user_result.data:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
         
         user_data = user_result.data[0]
         
-        result = supabase.table("comments").insert({
+        result = await db.table("comments").insert({
             "post_id": comment.post_id,
             "user_id": comment.user_id,
             "user_name": user_data["name"],
@@ -737,22 +979,22 @@ def create_comment(comment: CommentCreate):
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 @app.get("/comments/{post_id}")
-def get_comments(post_id: str):
+async def get_comments(post_id: str):
     try:
-        result = supabase.table("comments").select("*").eq("post_id", post_id).order("created_at", desc=False).execute()
+        result = await db.table("comments").select("*").eq("post_id", post_id).order("created_at", desc=False).execute()
         return result.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar comentários: {str(e)}")
 
 @app.put("/comments/{comment_id}")
-def update_comment(comment_id: str, comment_update: CommentUpdate):
+async def update_comment(comment_id: str, comment_update: CommentUpdate):
     try:
         # Primeiro verificar se o comentário existe e pertence ao usuário
-        existing_comment = supabase.table("comments").select("*").eq("id", comment_id).execute()
+        existing_comment = await db.table("comments").select("*").eq("id", comment_id).execute()
         if not existing_comment.data:
             raise HTTPException(status_code=404, detail="Comentário não encontrado")
         
-        result = supabase.table("comments").update({
+        result = await db.table("comments").update({
             "content": comment_update.content,
             "updated_at": datetime.now().isoformat()
         }).eq("id", comment_id).execute()
@@ -765,14 +1007,14 @@ def update_comment(comment_id: str, comment_update: CommentUpdate):
         raise HTTPException(status_code=500, detail=f"Erro ao atualizar comentário: {str(e)}")
 
 @app.delete("/comments/{comment_id}")
-def delete_comment(comment_id: str):
+async def delete_comment(comment_id: str):
     try:
         # Primeiro verificar se o comentário existe
-        existing_comment = supabase.table("comments").select("*").eq("id", comment_id).execute()
+        existing_comment = await db.table("comments").select("*").eq("id", comment_id).execute()
         if not existing_comment.data:
             raise HTTPException(status_code=404, detail="Comentário não encontrado")
         
-        result = supabase.table("comments").delete().eq("id", comment_id).execute()
+        result = await db.table("comments").delete().eq("id", comment_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Comentário não encontrado")
@@ -782,18 +1024,18 @@ def delete_comment(comment_id: str):
         raise HTTPException(status_code=500, detail=f"Erro ao deletar comentário: {str(e)}")
 
 @app.get("/posts/{post_id}/comments/count")
-def get_comments_count(post_id: str):
+async def get_comments_count(post_id: str):
     try:
-        result = supabase.table("comments").select("id", count="exact").eq("post_id", post_id).execute()
+        result = await db.table("comments").select("id", count="exact").eq("post_id", post_id).execute()
         return {"count": len(result.data) if result.data else 0}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao contar comentários: {str(e)}")
 
 # Rotas de perfil
 @app.get("/user/{user_id}")
-def get_user(user_id: str):
+async def get_user(user_id: str):
     try:
-        result = supabase.table("users").select("*").eq("id", user_id).execute()
+        result = await db.table("users").select("*").eq("id", user_id).execute()
         user = result.data[0] if result.data else None
         
         if not user:
@@ -805,7 +1047,7 @@ def get_user(user_id: str):
         raise HTTPException(status_code=500, detail=f"Erro ao buscar usuário: {str(e)}")
 
 @app.put("/user/{user_id}")
-def update_user(user_id: str, user_update: UserUpdate):
+async def update_user(user_id: str, user_update: UserUpdate):
     try:
         update_data = {}
         
@@ -822,7 +1064,7 @@ def update_user(user_id: str, user_update: UserUpdate):
                 )
             
             
-            existing_username = supabase.table("users").select("*").eq("username", user_update.username).neq("id", user_id).execute()
+            existing_username = await db.table("users").select("*").eq("username", user_update.username).neq("id", user_id).execute()
             if existing_username.data:
                 raise HTTPException(status_code=400, detail="Username já está em uso por outro usuário.")
             
@@ -843,7 +1085,7 @@ def update_user(user_id: str, user_update: UserUpdate):
         
         update_data["updated_at"] = datetime.now().isoformat()
         
-        result = supabase.table("users").update(update_data).eq("id", user_id).execute()
+        result = await db.table("users").update(update_data).eq("id", user_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
@@ -860,14 +1102,14 @@ def update_user(user_id: str, user_update: UserUpdate):
 
 # Rotas de seguidores
 @app.post("/follow")
-def follow_user(follow: FollowRequest):
+async def follow_user(follow: FollowRequest):
     try:
-        existing_follow = supabase.table("user_follows").select("*").eq("follower_id", follow.follower_id).eq("following_id", follow.following_id).execute()
+        existing_follow = await db.table("user_follows").select("*").eq("follower_id", follow.follower_id).eq("following_id", follow.following_id).execute()
         
         if existing_follow.data:
             raise HTTPException(status_code=400, detail="Já está seguindo este usuário")
         
-        result = supabase.table("user_follows").insert({
+        result = await db.table("user_follows").insert({
             "follower_id": follow.follower_id,
             "following_id": follow.following_id
         }).execute()
@@ -877,49 +1119,82 @@ def follow_user(follow: FollowRequest):
         raise HTTPException(status_code=500, detail=f"Erro ao seguir usuário: {str(e)}")
 
 @app.delete("/unfollow/{follower_id}/{following_id}")
-def unfollow_user(follower_id: str, following_id: str):
+async def unfollow_user(follower_id: str, following_id: str):
     try:
-        result = supabase.table("user_follows").delete().eq("follower_id", follower_id).eq("following_id", following_id).execute()
+        result = await db.table("user_follows").delete().eq("follower_id", follower_id).eq("following_id", following_id).execute()
         return {"message": "Deixou de seguir o usuário"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao deixar de seguir: {str(e)}")
 
+FOLLOW_PAGE_SIZE = 50
+FOLLOW_MAX_PAGE_SIZE = 200
+
+
+async def _fetch_follow_page(user_id: str, match_column: str, id_column: str, limit: int, offset: int, count_only: bool):
+    """Busca uma página de seguidores/seguindo com no máximo duas consultas.
+
+    A primeira traz os ids da página junto com o total exato; a segunda
+    hidrata todos os usuários de uma vez com um único IN.
+    """
+    if count_only:
+        result = await db.table("user_follows")\
+            .select(id_column, count="exact", head=True)\
+            .eq(match_column, user_id)\
+            .execute()
+        return {"count": result.count or 0}
+
+    limit = clamp_limit(limit, default=FOLLOW_PAGE_SIZE, maximum=FOLLOW_MAX_PAGE_SIZE)
+    offset = max(offset, 0)
+
+    result = await db.table("user_follows")\
+        .select(id_column, count="exact")\
+        .eq(match_column, user_id)\
+        .order(id_column)\
+        .range(offset, offset + limit - 1)\
+        .execute()
+
+    ids = [follow[id_column] for follow in result.data] if result.data else []
+    total = result.count or 0
+
+    users = []
+    if ids:
+        users_result = await db.table("users").select("id, name, username, avatar").in_("id", ids).execute()
+        users_by_id = {user["id"]: user for user in users_result.data or []}
+        users = [users_by_id[follow_id] for follow_id in ids if follow_id in users_by_id]
+
+    return {
+        "users": users,
+        "count": total,
+        "next_offset": offset + limit if offset + limit < total else None
+    }
+
+
 @app.get("/user/{user_id}/followers")
-def get_followers(user_id: str):
+async def get_followers(user_id: str, limit: int = FOLLOW_PAGE_SIZE, offset: int = 0, count_only: bool = False):
     try:
-        result = supabase.table("user_follows").select("follower_id").eq("following_id", user_id).execute()
-        follower_ids = [follow["follower_id"] for follow in result.data] if result.data else []
-        
-        followers = []
-        for follower_id in follower_ids:
-            user_result = supabase.table("users").select("id, name, username, avatar").eq("id", follower_id).execute()
-            if user_result.data:
-                followers.append(user_result.data[0])
+        page = await _fetch_follow_page(user_id, "following_id", "follower_id", limit, offset, count_only)
+        if count_only:
+            return page
         
-        return {"followers": followers}
+        return {"followers": page["users"], "count": page["count"], "next_offset": page["next_offset"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar seguidores: {str(e)}")
 
 @app.get("/user/{user_id}/following")
-def get_following(user_id: str):
+async def get_following(user_id: str, limit: int = FOLLOW_PAGE_SIZE, offset: int = 0, count_only: bool = False):
     try:
-        result = supabase.table("user_follows").select("following_id").eq("follower_id", user_id).execute()
-        following_ids = [follow["following_id"] for follow in result.data] if result.data else []
-        
-        following = []
-        for following_id in following_ids:
-            user_result = supabase.table("users").select("id, name, username, avatar").eq("id", following_id).execute()
-            if user_result.data:
-                following.append(user_result.data[0])
+        page = await _fetch_follow_page(user_id, "follower_id", "following_id", limit, offset, count_only)
+        if count_only:
+            return page
         
-        return {"following": following}
+        return {"following": page["users"], "count": page["count"], "next_offset": page["next_offset"]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar seguindo: {str(e)}")
 
 @app.get("/user/{user_id}/is_following/{target_id}")
-def check_is_following(user_id: str, target_id: str):
+async def check_is_following(user_id: str, target_id: str):
     try:
-        result = supabase.table("user_follows").select("*").eq("follower_id", user_id).eq("following_id", target_id).execute()
+        result = await db.table("user_follows").select("*").eq("follower_id", user_id).eq("following_id", target_id).execute()
         return {"is_following": len(result.data) > 0}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao verificar seguindo: {str(e)}")
@@ -930,9 +1205,9 @@ def read_root():
 
 # Adicione esta rota após as outras rotas de usuário
 @app.get("/users")
-def get_all_users():
+async def get_all_users():
     try:
-        result = supabase.table("users").select("id, name, username, avatar, email").execute()
+        result = await db.table("users").select("id, name, username, avatar, email").execute()
         
         users = []
         for user in result.data:
@@ -949,51 +1224,39 @@ def get_all_users():
 
 # E também uma rota de busca específica
 @app.get("/users/search")
-def search_users(q: str = ""):
+async def search_users(q: str = ""):
     try:
         if not q:
             return []
             
         # Busca por nome ou username
-        result = supabase.table("users").select("id, name, username, avatar").or_(f"name.ilike.%{q}%,username.ilike.%{q}%").execute()
+        result = await db.table("users").select("id, name, username, avatar").or_(f"name.ilike.%{q}%,username.ilike.%{q}%").execute()
         return result.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar usuários: {str(e)}")
 
 @app.get("/comments")
-def get_all_comments():
+async def get_all_comments():
     
     try:
-        result = supabase.table("comments").select("*").order("created_at", desc=True).execute()
+        result = await db.table("comments").select("*").order("created_at", desc=True).execute()
         return result.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao buscar comentários: {str(e)}")
 
 @app.get("/admin/stats")
-def get_admin_stats():
+async def get_admin_stats():
     
     try:
-        
-        users_result = supabase.table("users").select("id", count="exact").execute()
-        users_count = len(users_result.data) if users_result.data else 0
-       
-        posts_result = supabase.table("posts").select("id", count="exact").execute()
-        posts_count = len(posts_result.data) if posts_result.data else 0
-        
-        comments_result = supabase.table("comments").select("id", count="exact").execute()
-        comments_count = len(comments_result.data) if users_result.data else 0
-        
-        active_users_result = supabase.table("posts").select("user_id").execute()
-        active_users = len(set(post["user_id"] for post in active_users_result.data)) if active_users_result.data else 0
-        
+        snapshot = await admin_stats.get()
         return {
             "success": True,
             "stats": {
-                "total_users": users_count,
-                "total_posts": posts_count,
-                "total_comments": comments_count,
-                "active_users": active_users,
-                "timestamp": datetime.now().isoformat()
+                "total_users": snapshot["total_users"],
+                "total_posts": snapshot["total_posts"],
+                "total_comments": snapshot["total_comments"],
+                "active_users": snapshot["active_users"],
+                "timestamp": snapshot["timestamp"]
             }
         }
     except Exception as e:
@@ -1002,12 +1265,29 @@ def get_admin_stats():
             "error": str(e)
         }
 
+@app.get("/admin/engagement")
+async def get_admin_engagement():
+    """Posts e comentários por dia da semana, já agregados no snapshot do admin."""
+    try:
+        snapshot = await admin_stats.get()
+        return {
+            "success": True,
+            "days": snapshot["engagement_days"],
+            "data": snapshot["engagement"],
+            "timestamp": snapshot["timestamp"]
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 @app.get("/admin/users")
-def get_all_users_admin():
+async def get_all_users_admin():
     
     try:
         
-        result = supabase.table("users").select("id, name, email, username, role, updated_at").execute()
+        result = await db.table("users").select("id, name, email, username, role, updated_at").execute()
         
         
         users = []
@@ -1032,10 +1312,10 @@ def get_all_users_admin():
         }
 
 @app.put("/admin/users/{user_id}/role")
-def update_user_role(user_id: str, role: str):
+async def update_user_role(user_id: str, role: str):
     """Altera role do usuário (apenas admin)"""
     try:
-        result = supabase.table("users").update({
+        result = await db.table("users").update({
             "role": role,
             "updated_at": datetime.now().isoformat()
         }).eq("id", user_id).execute()
@@ -1052,17 +1332,17 @@ def update_user_role(user_id: str, role: str):
         }
     
 @app.delete("/admin/users/{user_id}")
-def delete_user(user_id: str):
+async def delete_user(user_id: str):
     """Deletar usuário (apenas admin)"""
     try:
         
-        supabase.table("comments").delete().eq("user_id", user_id).execute()
-        supabase.table("post_likes").delete().eq("user_id", user_id).execute()
-        supabase.table("posts").delete().eq("user_id", user_id).execute()
-        supabase.table("user_follows").delete().or_(f"follower_id.eq.{user_id},following_id.eq.{user_id}").execute()
+        await db.table("comments").delete().eq("user_id", user_id).execute()
+        await db.table("post_likes").delete().eq("user_id", user_id).execute()
+        await db.table("posts").delete().eq("user_id", user_id).execute()
+        await db.table("user_follows").delete().or_(f"follower_id.eq.{user_id},following_id.eq.{user_id}").execute()
         
         
-        result = supabase.table("users").delete().eq("id", user_id).execute()
+        result = await db.table("users").delete().eq("id", user_id).execute()
         
         if not result.data:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
@@ -1132,12 +1412,12 @@ async def get_match_details(match_id: str):
 async def get_events(tipo: Optional[str] = None):
     """Busca todos os eventos ativos"""
     try:
-        query = supabase.table("eventos").select("*").eq("is_active", True)
+        query = db.table("eventos").select("*").eq("is_active", True)
         
         if tipo:
             query = query.eq("tipo", tipo)
             
-        response = query.order("data_evento", desc=False).execute()
+        response = await query.order("data_evento", desc=False).execute()
         
         return response.data
     except Exception as e:
@@ -1147,7 +1427,7 @@ async def get_events(tipo: Optional[str] = None):
 async def get_event(event_id: str):
     """Busca um evento específico"""
     try:
-        response = supabase.table("eventos").select("*").eq("id", event_id).eq("is_active", True).single().execute()
+        response = await db.table("eventos").select("*").eq("id", event_id).eq("is_active", True).single().execute()
         
         if not response.data:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
@@ -1164,7 +1444,7 @@ async def create_event(event: EventCreate):
         event_data["inscricoes_atuais"] = 0
         event_data["created_at"] = datetime.now().isoformat()
         
-        response = supabase.table("eventos").insert(event_data).execute()
+        response = await db.table("eventos").insert(event_data).execute()
         
         if not response.data:
             raise HTTPException(status_code=400, detail="Erro ao criar evento")
@@ -1178,7 +1458,7 @@ async def register_for_event(event_id: str, registration: EventRegistration):
     """Inscreve usuário em um evento"""
     try:
         # Verifica se evento existe e tem vagas
-        event_response = supabase.table("eventos").select("*").eq("id", event_id).eq("is_active", True).single().execute()
+        event_response = await db.table("eventos").select("*").eq("id", event_id).eq("is_active", True).single().execute()
         
         if not event_response.data:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
@@ -1190,7 +1470,7 @@ async def register_for_event(event_id: str, registration: EventRegistration):
             raise HTTPException(status_code=400, detail="Evento lotado")
         
         # Verifica se usuário já está inscrito
-        existing_registration = supabase.table("event_registrations")\
+        existing_registration = await db.table("event_registrations")\
             .select("*")\
             .eq("event_id", event_id)\
             .eq("user_id", registration.user_id)\
@@ -1205,11 +1485,11 @@ async def register_for_event(event_id: str, registration: EventRegistration):
         registration_data["status"] = "confirmed"
         registration_data["created_at"] = datetime.now().isoformat()
         
-        registration_response = supabase.table("event_registrations").insert(registration_data).execute()
+        registration_response = await db.table("event_registrations").insert(registration_data).execute()
         
         # Atualiza contador de inscrições no evento
         new_participants_count = event_data["inscricoes_atuais"] + 1
-        supabase.table("eventos")\
+        await db.table("eventos")\
             .update({"inscricoes_atuais": new_participants_count})\
             .eq("id", event_id)\
             .execute()
@@ -1225,7 +1505,7 @@ async def register_for_event(event_id: str, registration: EventRegistration):
 async def get_event_registrations(event_id: str):
     """Busca todas as inscrições de um evento (admin apenas)"""
     try:
-        response = supabase.table("event_registrations")\
+        response = await db.table("event_registrations")\
             .select("*")\
             .eq("event_id", event_id)\
             .order("created_at", desc=True)\
@@ -1240,7 +1520,7 @@ async def delete_event(event_id: str):
     """Deleta um evento (soft delete - admin apenas)"""
     try:
         # Soft delete - marca como inativo
-        response = supabase.table("eventos")\
+        response = await db.table("eventos")\
             .update({"is_active": False})\
             .eq("id", event_id)\
             .execute()
@@ -1257,7 +1537,7 @@ async def cancel_registration(event_id: str, registration_id: str):
     """Cancela uma inscrição em evento"""
     try:
         # Busca a inscrição
-        registration_response = supabase.table("event_registrations")\
+        registration_response = await db.table("event_registrations")\
             .select("*")\
             .eq("id", registration_id)\
             .eq("event_id", event_id)\
@@ -1268,16 +1548,16 @@ async def cancel_registration(event_id: str, registration_id: str):
             raise HTTPException(status_code=404, detail="Inscrição não encontrada")
         
         # Deleta a inscrição
-        supabase.table("event_registrations")\
+        await db.table("event_registrations")\
             .delete()\
             .eq("id", registration_id)\
             .execute()
             
         # Atualiza contador do evento
-        event_response = supabase.table("eventos").select("inscricoes_atuais").eq("id", event_id).single().execute()
+        event_response = await db.table("eventos").select("inscricoes_atuais").eq("id", event_id).single().execute()
         if event_response.data:
             new_count = max(0, event_response.data["inscricoes_atuais"] - 1)
-            supabase.table("eventos")\
+            await db.table("eventos")\
                 .update({"inscricoes_atuais": new_count})\
                 .eq("id", event_id)\
                 .execute()
@@ -1291,7 +1571,8 @@ async def get_api_status():
     return {
         "has_premium_access": football_service.has_premium_access,
         "mode": "premium" if football_service.has_premium_access else "free",
-        "message": "API Premium ativa" if football_service.has_premium_access else "Usando dados mockados"
+        "message": "API Premium ativa" if football_service.has_premium_access else "Usando dados mockados",
+        "quota": football_service.get_quota_status()
     }
 
 
@@ -1304,7 +1585,13 @@ async def health_check():
             "football_api": "active",
             "news_service": "active",
             "database": "active"
-        }
+        },
+        "startup": {
+            **startup_report,
+            "football_probe_seconds": football_service.probe_seconds
+        },
+        "media_pipeline": media_pipeline.stats(),
+        "ranking": ranking_service.stats()
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+import os
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from services.database import db
+
+
+COUNTERS = ("total_users", "total_posts", "total_comments", "active_users")
+WEEKDAYS = ("Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom")
+# Horário de Brasília (sem horário de verão desde 2019), o mesmo do sql/010
+BRASILIA = timezone(timedelta(hours=-3))
+
+
+class AdminStatsService:
+    """Estatísticas do painel admin servidas de um snapshot em memória.
+
+    Os números vêm da tabela admin_counter_slots, mantida por trigger a cada
+    insert/delete (sql/005_admin_counters.sql e sql/009_admin_counter_slots.sql).
+    Cada contador é dividido em slots para os triggers não disputarem a
+    mesma linha, então atualizar o snapshot é ler algumas dezenas de linhas
+    e somar por nome.
+
+    O gráfico de engajamento (posts e comentários por dia da semana dos
+    últimos ADMIN_ENGAGEMENT_DAYS dias) vem da função
+    admin_weekday_activity (sql/010_admin_weekday_activity.sql), que devolve
+    só 7 linhas; sem ela, são duas contagens head por dia da janela. Se os contadores ainda não existirem, os
+    totais caem para consultas head com count exato (o Postgres conta e não
+    devolve nenhuma linha). O snapshot é refeito a cada
+    ADMIN_STATS_REFRESH_INTERVAL segundos.
+    """
+
+    def __init__(self):
+        self.refresh_interval = int(os.getenv("ADMIN_STATS_REFRESH_INTERVAL", "60"))
+        self.engagement_days = int(os.getenv("ADMIN_ENGAGEMENT_DAYS", "7"))
+        self._snapshot = None
+        self._refresh_task = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Erro ao atualizar estatísticas do admin: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def _read_counters(self):
+        result = await db.table("admin_counter_slots")\
+            .select("name, value")\
+            .in_("name", list(COUNTERS))\
+            .execute()
+        counters = {}
+        for row in result.data or []:
+            counters[row["name"]] = counters.get(row["name"], 0) + row["value"]
+        if set(COUNTERS) - counters.keys():
+            return None
+        # Um slot pode ficar negativo, o total não
+        return {name: max(value, 0) for name, value in counters.items()}
+
+    @staticmethod
+    async def _head_count(table, column="id"):
+        result = await db.table(table).select(column, count="exact", head=True).execute()
+        return result.count or 0
+
+    async def _count_tables(self):
+        users, posts, comments = await asyncio.gather(
+            self._head_count("users"),
+            self._head_count("posts"),
+            self._head_count("comments")
+        )
+        # post_authors (sql/005) tem uma linha por autora; sem ela não há como
+        # contar autoras distintas sem baixar os posts, e o painel mostra "—"
+        try:
+            active_users = await self._head_count("post_authors", "user_id")
+        except Exception:
+            active_users = None
+        return {
+            "total_users": users,
+            "total_posts": posts,
+            "total_comments": comments,
+            "active_users": active_users
+        }
+
+    async def _read_weekday_activity(self):
+        result = await db.rpc("admin_weekday_activity", {"p_days": self.engagement_days}).execute()
+        by_weekday = {row["weekday"]: row for row in result.data or []}
+        return [
+            {
+                "day": day,
+                "posts": (by_weekday.get(index + 1) or {}).get("posts", 0),
+                "comments": (by_weekday.get(index + 1) or {}).get("comments", 0)
+            }
+            for index, day in enumerate(WEEKDAYS)
+        ]
+
+    @staticmethod
+    async def _head_count_between(table, start, end):
+        result = await db.table(table)\
+            .select("id", count="exact", head=True)\
+            .gte("created_at", start.isoformat())\
+            .lt("created_at", end.isoformat())\
+            .execute()
+        return result.count or 0
+
+    async def _count_weekday_activity(self):
+        now = datetime.now(BRASILIA)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        buckets = {day: {"day": day, "posts": 0, "comments": 0} for day in WEEKDAYS}
+
+        # A janela começa em now - dias, igual à função do banco
+        windows = []
+        for back in range(self.engagement_days + 1):
+            start = max(today - timedelta(days=back), now - timedelta(days=self.engagement_days))
+            end = min(today - timedelta(days=back - 1), now)
+            if start < end:
+                windows.append((start, end))
+
+        counts = await asyncio.gather(*[
+            self._head_count_between(table, start, end)
+            for start, end in windows
+            for table in ("posts", "comments")
+        ])
+        for (start, _), posts, comments in zip(windows, counts[0::2], counts[1::2]):
+            bucket = buckets[WEEKDAYS[start.weekday()]]
+            bucket["posts"] += posts
+            bucket["comments"] += comments
+        return list(buckets.values())
+
+    async def _engagement(self):
+        try:
+            return await self._read_weekday_activity(), "counters"
+        except Exception as e:
+            print(f"admin_weekday_activity indisponível, usando count: {e}")
+            return await self._count_weekday_activity(), "count"
+
+    async def refresh(self):
+        async with self._lock:
+            try:
+                counters = await self._read_counters()
+            except Exception as e:
+                print(f"Contadores do admin indisponíveis, usando count: {e}")
+                counters = None
+
+            source = "counters"
+            if counters is None:
+                counters = await self._count_tables()
+                source = "count"
+
+            engagement, engagement_source = await self._engagement()
+
+            self._snapshot = {
+                **{name: counters[name] for name in COUNTERS},
+                "engagement": engagement,
+                "engagement_days": self.engagement_days,
+                "engagement_source": engagement_source,
+                "timestamp": datetime.now().isoformat(),
+                "source": source
+            }
+            return self._snapshot
+
+    async def get(self):
+        """Snapshot atual; só consulta o banco se ainda não houver nenhum."""
+        if self._snapshot is None:
+            return await self.refresh()
+        return self._snapshot
+
+
+admin_stats = AdminStatsService()
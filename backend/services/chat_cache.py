@@ -0,0 +1,65 @@
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_message(message):
+    """Dobra caixa, acentos e pontuação: "Como usar a plataforma?" == "como usar a plataforma"."""
+    text = unicodedata.normalize("NFKD", message.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+class ChatResponseCache:
+    """Cache LRU com TTL das respostas da Passinha para perguntas sem histórico."""
+
+    def __init__(self):
+        self.max_entries = int(os.getenv("CHAT_CACHE_SIZE", "500"))
+        self.ttl = int(os.getenv("CHAT_CACHE_TTL", "86400"))
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, message):
+        key = normalize_message(message)
+        entry = self._entries.get(key)
+
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, message, response):
+        key = normalize_message(message)
+        if not key:
+            return
+
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+chat_cache = ChatResponseCache()
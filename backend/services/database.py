@@ -0,0 +1,81 @@
+import os
+import importlib.util
+from typing import Optional
+
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+
+
+class Database:
+    """Camada de acesso ao Supabase compartilhada por todas as rotas.
+
+    Usa o cliente assíncrono do Supabase sobre um único httpx.AsyncClient com
+    pool de conexões (keep-alive e HTTP/2 quando o pacote h2 está instalado),
+    então uma consulta lenta não trava o event loop das outras requisições.
+    """
+
+    def __init__(self):
+        self.client: Optional[AsyncClient] = None
+        self.http_client: Optional[httpx.AsyncClient] = None
+
+        self.pool_size = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+        self.keepalive_connections = int(os.getenv("SUPABASE_KEEPALIVE_CONNECTIONS", str(self.pool_size)))
+        self.keepalive_expiry = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+        self.timeout = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+        self.http2 = os.getenv("SUPABASE_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+    async def connect(self):
+        if self.client is not None:
+            return self.client
+
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_KEY")
+        if not url or not key:
+            raise RuntimeError("SUPABASE_URL e SUPABASE_KEY não estão definidos no .env")
+
+        self.http_client = httpx.AsyncClient(
+            http2=self.http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+
+        self.client = await acreate_client(
+            url,
+            key,
+            options=AsyncClientOptions(
+                httpx_client=self.http_client,
+                postgrest_client_timeout=self.timeout,
+                storage_client_timeout=self.timeout
+            )
+        )
+
+        print(f"Supabase conectado (pool={self.pool_size}, http2={'sim' if self.http2 else 'não'})")
+        return self.client
+
+    async def close(self):
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        self.client = None
+        self.http_client = None
+
+    def _require_client(self):
+        if self.client is None:
+            raise RuntimeError("Banco de dados não inicializado - chame db.connect() no startup")
+        return self.client
+
+    def table(self, name):
+        return self._require_client().table(name)
+
+    def rpc(self, fn, params=None):
+        return self._require_client().rpc(fn, params or {})
+
+    @property
+    def storage(self):
+        return self._require_client().storage
+
+
+db = Database()
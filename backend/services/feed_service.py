@@ -0,0 +1,128 @@
+import os
+import asyncio
+import time
+
+from services.database import db
+from services.pagination import clamp_limit, decode_cursor, keyset_before, next_cursor
+
+
+class FeedService:
+    """Timeline "quem eu sigo" com fan-out na escrita.
+
+    Cada post novo é empurrado para a tabela user_feed de cada seguidora
+    (função fanout_post), então ler uma página custa O(tamanho da página).
+    Autoras com mais de FEED_FANOUT_MAX_FOLLOWERS seguidoras não recebem
+    fan-out: os posts delas são puxados e mesclados na hora da leitura.
+    """
+
+    def __init__(self):
+        self.max_fanout_followers = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", "5000"))
+        self.timeline_size = int(os.getenv("FEED_TIMELINE_SIZE", "500"))
+        self.trim_interval = int(os.getenv("FEED_TRIM_INTERVAL", "600"))
+        self.pull_authors_ttl = int(os.getenv("FEED_PULL_AUTHORS_TTL", "60"))
+
+        self._pull_authors = set()
+        self._pull_authors_loaded_at = 0.0
+        self._trim_task = None
+
+    async def start(self):
+        if self._trim_task is None:
+            self._trim_task = asyncio.create_task(self._trim_loop())
+
+    async def stop(self):
+        if self._trim_task is not None:
+            self._trim_task.cancel()
+            try:
+                await self._trim_task
+            except asyncio.CancelledError:
+                pass
+            self._trim_task = None
+
+    async def _trim_loop(self):
+        while True:
+            await asyncio.sleep(self.trim_interval)
+            try:
+                result = await db.rpc("trim_user_feeds", {"p_timeline_size": self.timeline_size}).execute()
+                if result.data:
+                    print(f"Feed: {result.data} entradas antigas removidas")
+            except Exception as e:
+                print(f"Erro ao podar timelines: {e}")
+
+    async def fan_out(self, post):
+        """Empurra um post recém-criado para as timelines das seguidoras."""
+        try:
+            result = await db.rpc("fanout_post", {
+                "p_post_id": post["id"],
+                "p_author_id": post["user_id"],
+                "p_created_at": post["created_at"],
+                "p_max_followers": self.max_fanout_followers
+            }).execute()
+
+            if result.data and result.data.get("mode") == "pull":
+                self._pull_authors.add(post["user_id"])
+        except Exception as e:
+            print(f"Erro no fan-out do post {post.get('id')}: {e}")
+
+    async def _get_pull_authors(self):
+        if time.monotonic() - self._pull_authors_loaded_at > self.pull_authors_ttl:
+            result = await db.table("feed_pull_authors").select("author_id").execute()
+            self._pull_authors = {row["author_id"] for row in result.data or []}
+            self._pull_authors_loaded_at = time.monotonic()
+        return self._pull_authors
+
+    async def get_feed(self, user_id, limit, before=None):
+        """Retorna (posts, próximo cursor) da timeline de user_id."""
+        limit = clamp_limit(limit)
+        if before:
+            decode_cursor(before)
+
+        query = db.table("user_feed").select("post_id, created_at").eq("user_id", user_id)
+        if before:
+            query = keyset_before(query, before, id_column="post_id")
+
+        feed_result = await query\
+            .order("created_at", desc=True)\
+            .order("post_id", desc=True)\
+            .limit(limit + 1)\
+            .execute()
+
+        post_ids = [row["post_id"] for row in feed_result.data or []]
+        posts = []
+        if post_ids:
+            posts_result = await db.table("posts").select("*").in_("id", post_ids).execute()
+            posts = posts_result.data or []
+
+        posts.extend(await self._pull_posts(user_id, limit, before))
+
+        unique_posts = {post["id"]: post for post in posts}
+        merged = sorted(unique_posts.values(), key=lambda post: (post["created_at"], str(post["id"])), reverse=True)
+        return next_cursor(merged, limit)
+
+    async def _pull_posts(self, user_id, limit, before):
+        pull_authors = await self._get_pull_authors()
+        if not pull_authors:
+            return []
+
+        follows_result = await db.table("user_follows")\
+            .select("following_id")\
+            .eq("follower_id", user_id)\
+            .in_("following_id", list(pull_authors))\
+            .execute()
+
+        author_ids = [row["following_id"] for row in follows_result.data or []]
+        if not author_ids:
+            return []
+
+        query = db.table("posts").select("*").in_("user_id", author_ids)
+        if before:
+            query = keyset_before(query, before)
+
+        result = await query\
+            .order("created_at", desc=True)\
+            .order("id", desc=True)\
+            .limit(limit + 1)\
+            .execute()
+        return result.data or []
+
+
+feed_service = FeedService()
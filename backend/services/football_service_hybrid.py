@@ -1,51 +1,187 @@
 import os
+import asyncio
+import time
 import httpx
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import random
 
 class FootballServiceHybrid:
     def __init__(self):
-        self.api_key = os.getenv("API_FOOTBALL_KEY")
         self.base_url = "https://v3.football.api-sports.io"
+        self.api_key = None
+        self.headers = {}
+        
+        # Cliente HTTP único com pool de conexões, aberto/fechado pelo lifespan do app
+        self.timeout = float(os.getenv("FOOTBALL_API_TIMEOUT", "10"))
+        self.connect_timeout = float(os.getenv("FOOTBALL_API_CONNECT_TIMEOUT", "5"))
+        self.pool_size = int(os.getenv("FOOTBALL_API_POOL_SIZE", "10"))
+        self.keepalive_expiry = float(os.getenv("FOOTBALL_API_KEEPALIVE_EXPIRY", "60"))
+        self.client = None
+        
+        # Cache curto por endpoint + uma única busca em andamento por chave
+        self.cache_ttl = {
+            "live": float(os.getenv("FOOTBALL_LIVE_TTL", "30")),
+            "upcoming": float(os.getenv("FOOTBALL_UPCOMING_TTL", "600"))
+        }
+        self._cache = {}
+        self._inflight = {}
+        
+        # Cota diária da api-sports.io (zera à meia-noite UTC)
+        self.daily_quota = int(os.getenv("API_FOOTBALL_DAILY_QUOTA", "100"))
+        self._quota_day = None
+        self._quota_used = 0
+        self._quota_remaining_header = None
+        
+        self.has_premium_access = False
+        self.probe_seconds = None
+        self._probe_task = None
+    
+    async def start(self):
+        # Lê a chave só aqui: o .env é carregado depois do import do módulo
+        self.api_key = os.getenv("API_FOOTBALL_KEY")
+        if not self.api_key:
+            # Sem chave não há o que checar: fica em mock, como antes
+            self.has_premium_access = False
+            print("Modo: MOCK (API_FOOTBALL_KEY não configurada)")
+            return
+
         self.headers = {
             'x-rapidapi-key': self.api_key,
             'x-rapidapi-host': 'v3.football.api-sports.io'
         }
         
-        self.has_premium_access = False
-        self._check_api_access()
+        if self.client is None:
+            try:
+                self.client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers=self.headers,
+                    timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size,
+                        keepalive_expiry=self.keepalive_expiry
+                    )
+                )
+            except Exception as e:
+                # Um cliente inválido não pode derrubar o startup do app
+                print(f"Modo: MOCK (erro ao criar cliente da API de futebol: {e})")
+                return
         
-        print(f"Modo: {'PREMIUM' if self.has_premium_access else 'MOCK'}")
+        # Não segura o startup: serve mock até a checagem da API terminar
+        if self._probe_task is None:
+            self._probe_task = asyncio.create_task(self._probe_api_access())
     
-    def _check_api_access(self):
-        try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._test_api_access())
-            loop.close()
-            self.has_premium_access = result
-        except:
-            self.has_premium_access = False
+    async def _probe_api_access(self):
+        started = time.perf_counter()
+        self.has_premium_access = await self._test_api_access()
+        self.probe_seconds = round(time.perf_counter() - started, 3)
+        print(f"Modo: {'PREMIUM' if self.has_premium_access else 'MOCK'} (checagem em {self.probe_seconds}s)")
+    
+    async def close(self):
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+        self._probe_task = None
+        
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+    
+    # === COTA E CACHE ===
+    
+    def _reset_quota_if_new_day(self):
+        today = datetime.now(timezone.utc).date()
+        if self._quota_day != today:
+            self._quota_day = today
+            self._quota_used = 0
+            self._quota_remaining_header = None
+    
+    def quota_remaining(self):
+        self._reset_quota_if_new_day()
+        remaining = self.daily_quota - self._quota_used
+        if self._quota_remaining_header is not None:
+            remaining = min(remaining, self._quota_remaining_header)
+        return max(remaining, 0)
+    
+    def _effective_ttl(self, key):
+        """Alarga o TTL conforme a cota do dia vai acabando."""
+        ratio = self.quota_remaining() / self.daily_quota if self.daily_quota > 0 else 0
+        if ratio > 0.5:
+            factor = 1
+        elif ratio > 0.25:
+            factor = 2
+        elif ratio > 0.1:
+            factor = 5
+        else:
+            factor = 20
+        return self.cache_ttl[key] * factor
+    
+    async def _request(self, path, params, timeout=None):
+        """Toda chamada à api-sports.io passa por aqui para contar a cota."""
+        self._reset_quota_if_new_day()
+        self._quota_used += 1
+        
+        kwargs = {"params": params}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        response = await self.client.get(path, **kwargs)
+        
+        remaining = response.headers.get("x-ratelimit-requests-remaining")
+        if remaining is not None and remaining.isdigit():
+            self._quota_remaining_header = int(remaining)
+        
+        return response
+    
+    async def _cached_fetch(self, key, fetcher):
+        """Serve do cache enquanto fresco; em caso de miss, requisições
+        concorrentes esperam a mesma busca em vez de cada uma chamar a API."""
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < self._effective_ttl(key):
+            return entry[1]
+        
+        if key not in self._inflight:
+            if self.quota_remaining() <= 0:
+                print(f"Cota diária esgotada, servindo cache antigo ({key})")
+                return entry[1] if entry else []
+            
+            task = asyncio.create_task(fetcher())
+            task.add_done_callback(lambda done: self._store_result(key, done))
+            self._inflight[key] = task
+        
+        # shield: se este cliente desconectar, a busca continua para os demais
+        return await asyncio.shield(self._inflight[key])
+    
+    def _store_result(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self._cache[key] = (time.monotonic(), task.result())
+    
+    def get_quota_status(self):
+        return {
+            "daily_quota": self.daily_quota,
+            "remaining": self.quota_remaining(),
+            "ttl_seconds": {key: self._effective_ttl(key) for key in self.cache_ttl}
+        }
     
     async def _test_api_access(self):
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/leagues",
-                    headers=self.headers,
-                    params={'search': 'women', 'season': 2024},
-                    timeout=5.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('results', 0) > 0 and not data.get('errors'):
-                        print("API Premium detectada!")
-                        return True
-                
-                print("Usando dados mockados (API Free)")
-                return False
+            response = await self._request(
+                "/leagues",
+                {'search': 'women', 'season': 2024},
+                timeout=5.0
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('results', 0) > 0 and not data.get('errors'):
+                    print("API Premium detectada!")
+                    return True
+            
+            print("Usando dados mockados (API Free)")
+            return False
                 
         except Exception as e:
             print(f"Erro na API, usando mock: {e}")
@@ -53,7 +189,7 @@ class FootballServiceHybrid:
     
     async def get_live_matches(self):
         if self.has_premium_access:
-            real_data = await self._get_real_live_matches()
+            real_data = await self._cached_fetch("live", self._get_real_live_matches)
             if real_data and len(real_data) > 0:
                 return {"data": real_data, "source": "api"}
         
@@ -63,7 +199,7 @@ class FootballServiceHybrid:
     
     async def get_upcoming_matches(self):
         if self.has_premium_access:
-            real_data = await self._get_real_upcoming_matches()
+            real_data = await self._cached_fetch("upcoming", self._get_real_upcoming_matches)
             if real_data and len(real_data) > 0:
                 return {"data": real_data, "source": "api"}
         
@@ -75,25 +211,22 @@ class FootballServiceHybrid:
     
     async def _get_real_live_matches(self):
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/fixtures",
-                    headers=self.headers,
-                    params={
-                        'live': 'all',
-                        'league': 74,
-                        'season': 2024
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('results', 0) > 0:
-                        print("Dados reais encontrados (Ao vivo)")
-                        return data.get('response', [])
-                
-                return []
+            response = await self._request(
+                "/fixtures",
+                {
+                    'live': 'all',
+                    'league': 74,
+                    'season': 2024
+                }
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('results', 0) > 0:
+                    print("Dados reais encontrados (Ao vivo)")
+                    return data.get('response', [])
+            
+            return []
                 
         except Exception as e:
             print(f"❌ Erro API real (live): {e}")
@@ -104,27 +237,24 @@ class FootballServiceHybrid:
             today = datetime.now().strftime('%Y-%m-%d')
             next_week = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.base_url}/fixtures",
-                    headers=self.headers,
-                    params={
-                        'from': today,
-                        'to': next_week,
-                        'league': 74,
-                        'season': 2024,
-                        'status': 'NS'
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('results', 0) > 0:
-                        print("Dados reais encontrados (Próximos)")
-                        return data.get('response', [])
-                
-                return []
+            response = await self._request(
+                "/fixtures",
+                {
+                    'from': today,
+                    'to': next_week,
+                    'league': 74,
+                    'season': 2024,
+                    'status': 'NS'
+                }
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('results', 0) > 0:
+                    print("Dados reais encontrados (Próximos)")
+                    return data.get('response', [])
+            
+            return []
                 
         except Exception as e:
             print(f"❌ Erro API real (upcoming): {e}")
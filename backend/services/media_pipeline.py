@@ -0,0 +1,146 @@
+import os
+import asyncio
+import importlib.util
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from services.database import db
+from services.media_worker import render_variant
+from services.upload_service import STORAGE_BUCKET, remove_local_file, upload_service
+
+
+# GIF (animado) e SVG ficam de fora: seguem só com o original
+PROCESSABLE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/webp", "image/bmp", "image/tiff"}
+PROCESSABLE_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "bmp", "tif", "tiff"}
+
+
+class MediaPipeline:
+    """Gera variantes WebP (thumbnail, feed, full) das imagens enviadas.
+
+    O /upload só envia o original e já responde com as URLs das variantes;
+    o redimensionamento roda num pool de processos fora da requisição e cada
+    variante aparece no storage assim que fica pronta. Sem o Pillow
+    instalado o pipeline fica desligado e o /upload funciona como antes.
+    """
+
+    def __init__(self):
+        self.enabled = (
+            os.getenv("MEDIA_PIPELINE", "1") == "1"
+            and importlib.util.find_spec("PIL") is not None
+        )
+        self.workers = int(os.getenv("MEDIA_WORKERS", "2"))
+        self.quality = int(os.getenv("MEDIA_WEBP_QUALITY", "80"))
+        self.variants = {
+            "thumbnail": int(os.getenv("MEDIA_THUMBNAIL_SIZE", "320")),
+            "feed": int(os.getenv("MEDIA_FEED_SIZE", "1080")),
+            "full": int(os.getenv("MEDIA_FULL_SIZE", "2048")),
+        }
+        self.max_tracked = int(os.getenv("MEDIA_STATUS_SIZE", "1000"))
+
+        self._pool = None
+        self._tasks = set()
+        self._status = OrderedDict()
+        self.ready = 0
+        self.failed = 0
+
+    async def start(self):
+        if self.enabled and self._pool is None:
+            # spawn: não herda as threads e conexões abertas do servidor
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        elif not self.enabled:
+            print("Media: Pillow não instalado ou MEDIA_PIPELINE=0, variantes desligadas")
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def accepts(self, content_type):
+        return self._pool is not None and content_type in PROCESSABLE_TYPES
+
+    @staticmethod
+    def variant_path(filename, variant):
+        return f"{filename.rsplit('.', 1)[0]}_{variant}.webp"
+
+    def variant_paths(self, filename):
+        """Caminhos no storage das variantes de um original (vazio se não for imagem)."""
+        if filename.rsplit('.', 1)[-1].lower() not in PROCESSABLE_EXTENSIONS:
+            return []
+        return [self.variant_path(filename, variant) for variant in self.variants]
+
+    async def process(self, local_path, filename):
+        """Agenda as variantes de um original já salvo em disco e devolve as URLs.
+
+        Passa a ser dono de local_path: o arquivo é apagado quando todas as
+        variantes terminarem.
+        """
+        bucket = db.storage.from_(STORAGE_BUCKET)
+        urls = {
+            variant: await bucket.get_public_url(self.variant_path(filename, variant))
+            for variant in self.variants
+        }
+
+        self._status[filename] = {variant: "pending" for variant in self.variants}
+        while len(self._status) > self.max_tracked:
+            self._status.popitem(last=False)
+
+        task = asyncio.create_task(self._process(local_path, filename))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return urls
+
+    async def _process(self, local_path, filename):
+        try:
+            await asyncio.gather(*(
+                self._render_and_store(local_path, filename, variant, max_side)
+                for variant, max_side in self.variants.items()
+            ))
+        finally:
+            await asyncio.to_thread(remove_local_file, local_path)
+
+    async def _render_and_store(self, local_path, filename, variant, max_side):
+        target_path = f"{local_path}-{variant}.webp"
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._pool, render_variant, local_path, target_path, max_side, self.quality)
+            await upload_service.store(target_path, self.variant_path(filename, variant), "image/webp")
+            self._set_status(filename, variant, "ready")
+            self.ready += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._set_status(filename, variant, "failed")
+            self.failed += 1
+            print(f"Erro ao gerar variante {variant} de {filename}: {e}")
+        finally:
+            await asyncio.to_thread(remove_local_file, target_path)
+
+    def _set_status(self, filename, variant, status):
+        if filename in self._status:
+            self._status[filename][variant] = status
+
+    def status(self, filename):
+        """Estado de cada variante (pending/ready/failed) ou None se não for acompanhado."""
+        variants = self._status.get(filename)
+        return dict(variants) if variants is not None else None
+
+    def stats(self):
+        return {
+            "enabled": self._pool is not None,
+            "workers": self.workers,
+            "in_progress": len(self._tasks),
+            "variants_ready": self.ready,
+            "variants_failed": self.failed
+        }
+
+
+media_pipeline = MediaPipeline()
@@ -0,0 +1,24 @@
+"""Trabalho que roda nos processos do pool do MediaPipeline.
+
+Fica num módulo separado e sem dependências do servidor para que os
+processos filhos (spawn) só importem o Pillow.
+"""
+import os
+
+
+def render_variant(source_path, target_path, max_side, quality):
+    """Roda no processo do pool: gera uma variante WebP de até max_side pixels."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as original:
+        # JPEG: decodifica direto numa escala menor, bem mais rápido para miniaturas
+        original.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_side, max_side))
+
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        image.save(target_path, "WEBP", quality=quality, method=4)
+    return os.path.getsize(target_path)
@@ -1,11 +1,36 @@
+import os
+import asyncio
+import time
 import random
 from datetime import datetime, timedelta
 import re
-import requests
+import httpx
 import xml.etree.ElementTree as ET
 
 class NewsService:
     def __init__(self):
+        # Cache stale-while-revalidate: a requisição sempre responde com o
+        # último resultado bom e a atualização dos RSS roda em segundo plano
+        self.cache_ttl = int(os.getenv("NEWS_CACHE_TTL", "300"))
+        self.refresh_interval = int(os.getenv("NEWS_REFRESH_INTERVAL", "600"))
+        self.retry_interval = int(os.getenv("NEWS_RETRY_INTERVAL", "60"))
+        self.cache_size = 20
+        
+        self._cached_news = None
+        self._cached_at = None
+        self._cached_is_real = False
+        self._last_attempt_at = 0.0
+        self._refresh_task = None
+        self._refresh_loop_task = None
+        
+        # Busca concorrente: um cliente HTTP compartilhado, prazo total para
+        # todos os feeds e ETag/Last-Modified por feed
+        self.fetch_deadline = float(os.getenv("NEWS_FETCH_DEADLINE", "8"))
+        self.feed_timeout = float(os.getenv("NEWS_FEED_TIMEOUT", "5"))
+        self.http_client = None
+        self._feed_state = {}
+        self.feed_stats = {}
+        
         self.feeds = [
             {
                 "url": "https://ge.globo.com/rss/futebol/futebol-feminino/",
@@ -34,112 +59,220 @@ class NewsService:
             'paulistão', 'carioca', 'gaúcho', 'seleção', 'selecao'
         ]
 
-    def get_news(self, limit=6):
+    async def start(self):
+        if self._refresh_loop_task is None:
+            self._refresh_loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        for task in (self._refresh_loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._refresh_loop_task = None
+        self._refresh_task = None
+        
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def _get_client(self):
+        if self.http_client is None:
+            self.http_client = httpx.AsyncClient(
+                timeout=self.feed_timeout,
+                follow_redirects=True,
+                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=len(self.feeds))
+            )
+        return self.http_client
+
+    async def _refresh_loop(self):
+        while True:
+            self._schedule_refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def get_news(self, limit=6):
+        """Responde na hora com o cache e dispara a atualização se estiver velho."""
+        if self._is_stale():
+            self._schedule_refresh()
+        
+        if self._cached_news is None:
+            return self._get_fallback_news(limit)
+        
+        return self._cached_news[:limit]
+
+    def cache_age(self):
+        if self._cached_at is None:
+            return None
+        return round(time.time() - self._cached_at, 1)
+
+    def _is_stale(self):
+        if self._cached_at is not None and time.time() - self._cached_at < self.cache_ttl:
+            return False
+        return time.time() - self._last_attempt_at >= self.retry_interval
+
+    def _schedule_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self):
+        self._last_attempt_at = time.time()
+        try:
+            news, is_real = await self._build_news(self.cache_size)
+        except Exception as e:
+            print(f"Erro ao atualizar notícias: {e}")
+            return
+        
+        # Nunca troca notícias reais já em cache por fallback
+        if is_real or not self._cached_is_real:
+            self._cached_news = news
+            self._cached_at = time.time()
+            self._cached_is_real = is_real
+
+    async def _build_news(self, limit):
         print("Iniciando busca por notícias reais...")
         
-        real_news = self._get_real_news_optimized()
+        real_news = await self._get_real_news_optimized()
         
         if real_news and len(real_news) > 2:  
             print(f"{len(real_news)} notícias reais encontradas!")
-            return real_news[:limit]
+            return real_news[:limit], True
         else:
             print("Poucas notícias reais, completando com fallback")
             fallback = self._get_fallback_news(limit)
             
             if real_news:
                 mixed_news = real_news + fallback[len(real_news):]
-                return mixed_news[:limit]
+                return mixed_news[:limit], True
             else:
-                return fallback
+                return fallback, False
 
-    def _get_real_news_optimized(self):
+    async def _get_real_news_optimized(self):
+        """Busca todos os feeds em paralelo dentro de um prazo total."""
+        tasks = {asyncio.create_task(self._fetch_feed(feed)): feed for feed in self.feeds}
+        done, pending = await asyncio.wait(tasks, timeout=self.fetch_deadline)
+        
+        for task in pending:
+            task.cancel()
+            feed = tasks[task]
+            print(f"{feed['fonte']}: estourou o prazo de {self.fetch_deadline}s")
+            self._record_stat(feed, "timeout", self.fetch_deadline)
+        
         news_list = []
+        for task in tasks:
+            if task in done:
+                news_list.extend(task.result())
         
-        for feed in self.feeds:
-            try:
-                print(f"Tentando: {feed['fonte']}")
+        return news_list
+
+    async def _fetch_feed(self, feed):
+        state = self._feed_state.setdefault(feed['url'], {})
+        headers = {'Accept': 'application/rss+xml, application/xml, text/xml'}
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+        
+        started = time.perf_counter()
+        try:
+            async with self._get_client().stream("GET", feed['url'], headers=headers) as response:
+                if response.status_code == 304:
+                    self._record_stat(feed, "not_modified", time.perf_counter() - started)
+                    print(f"{feed['fonte']}: sem alterações (304)")
+                    return state.get('items', [])
+                
+                response.raise_for_status()
                 
                 if feed['type'] == 'direct':
-                    news = self._fetch_feed(feed['url'], feed['fonte'])
+                    news = await self._parse_feed_stream(response, feed['fonte'], max_items=10, max_scanned=10, filter_feminino=False)
                 else:
-                    news = self._fetch_and_filter_feed(feed['url'], feed['fonte'])
-                
-                news_list.extend(news)
-                print(f"{feed['fonte']}: {len(news)} notícias")
+                    news = await self._parse_feed_stream(response, feed['fonte'], max_items=10, max_scanned=20, filter_feminino=True)
                 
-            except Exception as e:
-                print(f"Erro em {feed['fonte']}: {e}")
-                continue
-        
-        return news_list
-
-    def _fetch_feed(self, url, fonte):
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/rss+xml, application/xml, text/xml'
-            }
+                state['etag'] = response.headers.get('ETag')
+                state['last_modified'] = response.headers.get('Last-Modified')
+                state['items'] = news
             
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
+            self._record_stat(feed, "success", time.perf_counter() - started)
+            print(f"{feed['fonte']}: {len(news)} notícias")
+            return news
             
-            root = ET.fromstring(response.content)
-            news_items = []
+        except Exception as e:
+            self._record_stat(feed, "failure", time.perf_counter() - started, error=str(e))
+            print(f"Erro no feed {feed['fonte']}: {e}")
+            return []
+
+    async def _parse_feed_stream(self, response, fonte, max_items, max_scanned, filter_feminino):
+        """Lê o RSS em pedaços e para assim que tem itens suficientes.
+
+        Cada <item> é processado no evento de fechamento e limpo logo em
+        seguida, então nem o documento inteiro é baixado nem a árvore
+        completa fica em memória.
+        """
+        parser = ET.XMLPullParser(events=("end",))
+        news_items = []
+        scanned = 0
+        
+        async for chunk in response.aiter_bytes():
+            parser.feed(chunk)
             
-            for item in root.findall('.//item')[:10]:
-                title_elem = item.find('title')
-                if title_elem is not None:
-                    title = title_elem.text or ""
-                    
+            for _, elem in parser.read_events():
+                if elem.tag != 'item':
+                    continue
+                
+                scanned += 1
+                title = elem.findtext('title')
+                
+                if title is not None and (not filter_feminino or self._is_futebol_feminino(title)):
+                    link = elem.findtext('link')
+                    description = elem.findtext('description')
                     news_item = self._create_news_item(
-                        title, 
-                        item.find('link').text if item.find('link') is not None else "#",
-                        item.find('description').text if item.find('description') is not None else title,
+                        title,
+                        link if link is not None else "#",
+                        description if description is not None else title,
                         fonte
                     )
                     
                     if news_item:
                         news_items.append(news_item)
-            
-            return news_items
-            
-        except Exception as e:
-            print(f"Erro ao buscar feed {fonte}: {e}")
-            return []
+                
+                elem.clear()
+                
+                if len(news_items) >= max_items or scanned >= max_scanned:
+                    return news_items
+        
+        parser.close()
+        return news_items
 
-    def _fetch_and_filter_feed(self, url, fonte):
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            root = ET.fromstring(response.content)
-            news_items = []
-            
-            for item in root.findall('.//item')[:20]:
-                title_elem = item.find('title')
-                if title_elem is not None:
-                    title = title_elem.text or ""
-                    
-                    if self._is_futebol_feminino(title):
-                        news_item = self._create_news_item(
-                            title,
-                            item.find('link').text if item.find('link') is not None else "#",
-                            item.find('description').text if item.find('description') is not None else title,
-                            fonte
-                        )
-                        
-                        if news_item:
-                            news_items.append(news_item)
-            
-            return news_items
-            
-        except Exception as e:
-            print(f"Erro no feed {fonte}: {e}")
-            return []
+    def _record_stat(self, feed, outcome, elapsed, error=None):
+        stats = self.feed_stats.setdefault(feed['fonte'], {
+            "success": 0,
+            "not_modified": 0,
+            "failure": 0,
+            "timeout": 0,
+            "last_latency_ms": None,
+            "avg_latency_ms": None,
+            "last_error": None,
+            "last_fetch": None
+        })
+        
+        stats[outcome] += 1
+        latency_ms = round(elapsed * 1000, 1)
+        stats["last_latency_ms"] = latency_ms
+        
+        attempts = stats["success"] + stats["not_modified"] + stats["failure"] + stats["timeout"]
+        previous_avg = stats["avg_latency_ms"] or 0
+        stats["avg_latency_ms"] = round(previous_avg + (latency_ms - previous_avg) / attempts, 1)
+        stats["last_fetch"] = datetime.now().isoformat()
+        if error:
+            stats["last_error"] = error
+
+    def get_stats(self):
+        return {
+            "cache_age_seconds": self.cache_age(),
+            "feeds": self.feed_stats
+        }
 
     def _create_news_item(self, title, link, description, fonte):
         try:
@@ -0,0 +1,56 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def clamp_limit(limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def encode_cursor(created_at, row_id):
+    """Gera um cursor opaco a partir da última linha da página (created_at + id)."""
+    raw = json.dumps([created_at, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Retorna (created_at, id) ou levanta ValueError se o cursor for inválido.
+
+    Os dois valores vão direto para o filtro do PostgREST, então só passam
+    um timestamp ISO e um uuid reescritos por nós, nunca o texto recebido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00")).isoformat()
+        row_id = str(uuid.UUID(row_id))
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+    return created_at, row_id
+
+
+def keyset_before(query, cursor, created_column="created_at", id_column="id"):
+    """Aplica o filtro de keyset (created_at, id) < cursor numa consulta ordenada desc."""
+    created_at, row_id = decode_cursor(cursor)
+    return query.or_(
+        f'{created_column}.lt."{created_at}",'
+        f'and({created_column}.eq."{created_at}",{id_column}.lt."{row_id}")'
+    )
+
+
+def next_cursor(rows, limit, created_column="created_at", id_column="id"):
+    """Corta a linha extra buscada (limit + 1) e devolve (página, próximo cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last[created_column], last[id_column])
@@ -0,0 +1,231 @@
+import os
+import math
+from collections import Counter
+
+from services.chat_cache import normalize_message
+from services.passinha_service import PASSINHA_SYSTEM_PROMPT
+
+
+STOPWORDS = {
+    "a", "o", "as", "os", "um", "uma", "uns", "umas", "de", "do", "da", "dos", "das",
+    "em", "no", "na", "nos", "nas", "por", "para", "pra", "com", "sem", "e", "ou",
+    "que", "qual", "quais", "como", "me", "eu", "voce", "vc", "meu", "minha", "seu",
+    "sua", "se", "ao", "aos", "mais", "muito", "tem", "ter", "ser", "sobre", "algum",
+    "alguma", "quero", "queria", "pode", "poderia", "dar", "da", "fala", "falar",
+    "passinha", "ola", "oi", "isso", "esse", "essa", "ate", "x", "dica", "dicas",
+    # Verbos de pedido ("como usar...", "como funciona..."): não dizem o assunto
+    "usar", "uso", "utilizar", "funciona", "funcionar", "funcionam", "mexer",
+    # Presentes em quase toda pergunta da plataforma, não ajudam a escolher seção
+    "futebol", "feminino", "feminina"
+}
+
+# Seções do prompt que descrevem a própria Passinha, não respostas
+SKIP_SECTIONS = {"SUA PERSONALIDADE", "SUAS FUNÇÕES PRINCIPAIS", "REGRAS IMPORTANTES"}
+
+
+def tokenize(text):
+    tokens = []
+    for word in normalize_message(text).replace("_", " ").split():
+        if word in STOPWORDS or word.isdigit():
+            continue
+        # Stemming mínimo: plural simples ("receitas" -> "receita")
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def _pretty_title(title):
+    title = title.lower()
+    return title[0].upper() + title[1:]
+
+
+class PassinhaKnowledge:
+    """Índice BM25 das seções do PASSINHA_SYSTEM_PROMPT.
+
+    Perguntas que batem com confiança numa seção (plataforma, treinos,
+    receitas, hidratação) são respondidas localmente, sem chamar o Gemini.
+    Se as melhores seções empatam dentro do mesmo grupo (ex.: as quatro
+    páginas da plataforma), a resposta é o grupo inteiro.
+
+    Confiança exige as quatro coisas: pontuação mínima; todos os termos
+    conhecidos em perguntas curtas (até CHAT_LOCAL_SHORT_QUERY termos);
+    a melhor seção perto do máximo possível para a pergunta (cada termo na
+    seção onde ele mais pesa); e folga sobre a melhor seção fora da resposta.
+    Os limites são conferidos com benchmarks/passinha_knowledge_check.py.
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, prompt):
+        self.min_score = float(os.getenv("CHAT_LOCAL_MIN_SCORE", "2.0"))
+        self.min_coverage = float(os.getenv("CHAT_LOCAL_MIN_COVERAGE", "0.75"))
+        self.short_query = int(os.getenv("CHAT_LOCAL_SHORT_QUERY", "3"))
+        self.min_relative = float(os.getenv("CHAT_LOCAL_MIN_RELATIVE", "0.8"))
+        self.min_margin = float(os.getenv("CHAT_LOCAL_MIN_MARGIN", "1.5"))
+        self.tie_margin = float(os.getenv("CHAT_LOCAL_TIE_MARGIN", "0.15"))
+
+        self.sections = self._parse_sections(prompt)
+        self.groups = {}
+        for section in self.sections:
+            self.groups.setdefault(section["group"], []).append(section)
+
+        self._build_index()
+        self.hits = 0
+        self.escalations = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _is_header(line):
+        # "NA PÁGINA PRINCIPAL (ícone da casa):" - só o que vem antes do parêntese é maiúsculo
+        head = line.split("(")[0]
+        return line.endswith(":") and head == head.upper() and any(char.isalpha() for char in head)
+
+    def _parse_sections(self, prompt):
+        sections = []
+        current = None
+
+        # Cada seção é um cabeçalho em maiúsculas seguido de um bloco de linhas
+        for raw_line in prompt.strip().splitlines():
+            line = raw_line.strip()
+            if not line:
+                current = None
+            elif self._is_header(line):
+                current = {"title": line[:-1].strip(), "group": None, "lines": []}
+                sections.append(current)
+            elif current is not None:
+                current["lines"].append(line)
+
+        indexed = []
+        group = None
+        for section in sections:
+            if not section["lines"]:
+                # Cabeçalho sem corpo ("ROTINAS DE TREINO PARA JOGADORAS") agrupa as seguintes
+                group = section["title"]
+                continue
+            if section["title"] in SKIP_SECTIONS:
+                continue
+
+            section["group"] = group
+            section["body"] = "\n".join(section["lines"])
+            section["tokens"] = tokenize(f"{section['title']} {group or ''} {section['body']}")
+            indexed.append(section)
+        return indexed
+
+    def _build_index(self):
+        self.doc_freq = Counter()
+        for section in self.sections:
+            section["term_freq"] = Counter(section["tokens"])
+            self.doc_freq.update(section["term_freq"].keys())
+
+        total_length = sum(len(section["tokens"]) for section in self.sections)
+        self.avg_length = total_length / len(self.sections) if self.sections else 0
+        count = len(self.sections)
+        self.idf = {
+            term: math.log(1 + (count - freq + 0.5) / (freq + 0.5))
+            for term, freq in self.doc_freq.items()
+        }
+
+    def _score(self, section, query_terms):
+        score = 0.0
+        length_norm = 1 - self.b + self.b * len(section["tokens"]) / self.avg_length
+        for term in query_terms:
+            freq = section["term_freq"].get(term, 0)
+            if freq:
+                score += self.idf[term] * freq * (self.k1 + 1) / (freq + self.k1 * length_norm)
+        return score
+
+    def _rank(self, message):
+        """Retorna a melhor correspondência: seções da resposta e as medidas de confiança.
+
+        relative é a pontuação da melhor seção sobre o máximo possível para a
+        pergunta; margin é a razão entre ela e a melhor seção fora da resposta.
+        """
+        match = {"sections": None, "score": 0.0, "coverage": 0.0, "terms": 0, "relative": 0.0, "margin": 0.0}
+        query_terms = list(dict.fromkeys(tokenize(message)))
+        if not query_terms or not self.sections:
+            return match
+
+        known_terms = [term for term in query_terms if term in self.doc_freq]
+        match["terms"] = len(query_terms)
+        match["coverage"] = len(known_terms) / len(query_terms)
+
+        scored = sorted(
+            ((self._score(section, known_terms), index) for index, section in enumerate(self.sections)),
+            reverse=True
+        )
+        best_score = scored[0][0]
+        if best_score <= 0:
+            return match
+
+        ties = [(score, index) for score, index in scored if score >= best_score * (1 - self.tie_margin)]
+        if len(ties) == 1:
+            answer_sections = [self.sections[ties[0][1]]]
+            confidence = best_score
+        else:
+            groups = {self.sections[index]["group"] for score, index in ties}
+            if len(groups) != 1 or None in groups:
+                return match
+            # Empate dentro do mesmo grupo: a pergunta é sobre o grupo todo
+            answer_sections = self.groups[groups.pop()]
+            confidence = sum(score for score, index in ties)
+
+        answer_ids = {id(section) for section in answer_sections}
+        runner_up = max((score for score, index in scored if id(self.sections[index]) not in answer_ids), default=0.0)
+        best_possible = sum(max(self._score(section, [term]) for section in self.sections) for term in known_terms)
+
+        match.update(
+            sections=answer_sections,
+            score=confidence,
+            relative=best_score / best_possible,
+            margin=best_score / runner_up if runner_up > 0 else float("inf")
+        )
+        return match
+
+    def _confident(self, match):
+        required_coverage = 1.0 if match["terms"] <= self.short_query else self.min_coverage
+        return (
+            match["sections"] is not None
+            and match["score"] >= self.min_score
+            and match["coverage"] >= required_coverage
+            and match["relative"] >= self.min_relative
+            and match["margin"] >= self.min_margin
+        )
+
+    def answer(self, message):
+        """Retorna a resposta local ou None para escalar ao Gemini."""
+        match = self._rank(message)
+
+        if not self._confident(match):
+            self.escalations += 1
+            return None
+
+        self.hits += 1
+        return self._format(match["sections"])
+
+    def best_effort(self, message):
+        """Melhor seção mesmo abaixo dos limites; usada quando o Gemini não responde a tempo."""
+        answer_sections = self._rank(message)["sections"]
+        if answer_sections is None:
+            return None
+
+        self.fallbacks += 1
+        return self._format(answer_sections)
+
+    def _format(self, sections):
+        parts = [f"{_pretty_title(section['title'])}:\n{section['body']}" for section in sections]
+        return "Claro! Aqui vai:\n\n" + "\n\n".join(parts) + "\n\nQuer que eu detalhe mais alguma coisa?"
+
+    def stats(self):
+        total = self.hits + self.escalations
+        return {
+            "sections": len(self.sections),
+            "local_answers": self.hits,
+            "escalated": self.escalations,
+            "fallback_answers": self.fallbacks,
+            "local_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+passinha_knowledge = PassinhaKnowledge(PASSINHA_SYSTEM_PROMPT)
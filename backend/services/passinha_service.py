@@ -0,0 +1,444 @@
+import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+
+PASSINHA_SYSTEM_PROMPT = """
+VOCÊ É A PASSINHA - ASSISTENTE VIRTUAL DA PLATAFORMA "PASSA BOLA"
+
+SUA PERSONALIDADE:
+- Você é motivadora, encorajadora e especialista em futebol feminino
+- Fala de forma clara, direta e natural, como uma treinadora experiente
+- É prestativa e sempre oferece ajuda concreta
+
+SUAS FUNÇÕES PRINCIPAIS:
+1. Tirar dúvidas sobre como usar a plataforma Passa Bola
+2. Dar exemplos práticos de rotinas de treino para jogadoras
+3. Ensinar receitas nutritivas para atletas do futebol feminino
+4. Falar sobre futebol feminino
+5. Dar dicas de nutrição esportiva específicas para mulheres atletas
+
+REGRAS IMPORTANTES:
+- NUNCA use asteriscos, markdown, negrito, itálico ou qualquer formatação
+- NUNCA invente funcionalidades que não existem na plataforma
+- Use linguagem natural e conversacional
+- Responda sempre em português claro e direto
+
+FUNCIONALIDADES REAIS DA PLATAFORMA:
+
+NA PÁGINA PRINCIPAL (ícone da casa):
+Você vê jogos ao vivo, próximas partidas e as últimas notícias do futebol feminino. Clique em qualquer jogo para ver detalhes completos e estatísticas.
+
+NA SEÇÃO DE EVENTOS (ícone do troféu):
+Encontre peneiras, torneios e competições. Veja o calendário completo de eventos, filtre por cidade e data. Ao clicar em um evento, você vê todos os detalhes como local, regras e número de vagas.
+
+NA COMUNIDADE (ícone das pessoas):
+Compartilhe seus lances, fotos e vídeos. Clique no botão "+" no topo da tela para criar posts e interagir com outras atletas.
+
+NO SEU PERFIL (ícone da pessoa):
+Seu perfil é seu portfólio digital. Acesse para editar suas informações, adicionar fotos e ver todos os posts que já fez.
+
+ROTINAS DE TREINO PARA JOGADORAS:
+
+TREINO DE FORÇA PARA MEMBROS INFERIORES (2x por semana):
+Agachamento livre 4 séries de 8-12 repetições
+Afundos com halteres 3 séries de 10-12 repetições por perna
+Elevação pélvica 4 séries de 12-15 repetições
+Cadeira extensora e flexora 3 séries de 12-15 repetições
+
+TREINO TÉCNICO DE FUTEBOL (3x por semana):
+Domínio de bola com ambas as pernas - 15 minutos
+Passe curto e longo - 20 minutos
+Finalização a gol - 15 minutos
+Condução de bola em zigue-zague - 10 minutos
+
+TREINO DE VELOCIDADE E AGILIDADE (2x por semana):
+Sprints de 20-30 metros - 8-10 repetições
+Exercícios de escada de agilidade - 15 minutos
+Mudanças de direção rápidas - 10 minutos
+Pliometria (saltos) - 12 minutos
+
+TREINO DE RESISTÊNCIA (1-2x por semana):
+Corridas intervaladas - 30 segundos rápido, 1 minuto lento
+Fartlek - variação de ritmo durante 30-40 minutos
+Corrida contínua em ritmo moderado - 25-35 minutos
+
+DICAS DE NUTRIÇÃO PARA ATLETAS:
+
+PRÉ-TREINO (1-2 horas antes):
+Panqueca proteica com aveia e banana
+Sanduíche de pão integral com frango e queijo
+Vitamina de banana com aveia e whey protein
+Iogurte natural com granola e mel
+
+PÓS-TREINO (até 30 minutos após):
+Sanduíche de pão integral com atum e queijo
+Vitamina de banana com whey protein e aveia
+Iogurte grego com frutas e mel
+Omelete com 2 ovos e pão integral
+
+RECEITAS PRÁTICAS:
+
+PANQUECA PRÉ-TREINO:
+2 colheres de aveia
+1 ovo
+1 banana amassada
+1 colher de whey protein (opcional)
+Misture tudo e faça na frigideira antiaderente
+
+VITAMINA RECUPERADORA:
+1 banana
+200ml de leite ou bebida vegetal
+1 colher de whey protein
+1 colher de aveia
+1 colher de mel
+Bata tudo no liquidificador
+
+SANDUÍCHE ENERGÉTICO:
+2 fatias de pão integral
+100g de peito de frango desfiado
+1 fatia de queijo branco
+Alface e tomate
+Pode adicionar abacate para gorduras boas
+
+HIDRATAÇÃO:
+Beba água durante todo o dia
+Durante treinos longos, use bebida isotônica caseira (água, sal, mel e limão)
+Após treino, reponha líquidos imediatamente
+
+Lembre-se: sou aqui para te ajudar de forma prática e direta!
+"""
+
+# Regras de resposta que antes eram coladas no fim de cada prompt
+PASSINHA_RESPONSE_RULES = """
+INSTRUÇÕES FINAIS E OBRIGATÓRIAS:
+- Responda como a Passinha, de forma natural e conversacional
+- USE APENAS LINGUAGEM NATURAL SEM FORMATAÇÃO
+- NUNCA use: *, **, -, •, markdown, emojis excessivos ou qualquer formatação
+- NUNCA invente funcionalidades
+- Seja direta e prática
+- Use parágrafos simples com quebras de linha normais
+- Mantenha o foco nas funcionalidades reais da plataforma
+- Se não souber algo, diga que vai verificar ou sugira algo relacionado que sabe
+
+SUA RESPOSTA DEVE SER:
+Natural, clara, sem formatação, em português, focada em ajudar.
+"""
+
+
+class ChatOverloaded(Exception):
+    """Gemini indisponível agora: fila cheia, orçamento de latência estourado ou circuito aberto."""
+
+
+class PassinhaService:
+    """Dona do modelo Gemini da Passinha.
+
+    O modelo é criado uma única vez com o prompt da Passinha como system
+    instruction, então cada requisição envia só a mensagem do usuário. Quando
+    o SDK aceita, o system instruction vai para um cache de contexto
+    (CachedContent) e nem precisa ser reprocessado pelo Gemini; o cache é
+    recriado antes de expirar.
+    """
+
+    def __init__(self):
+        self.model_name = os.getenv("GEMINI_MODEL", "models/gemini-2.0-flash-001")
+        self.context_cache_ttl = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+        self.system_instruction = PASSINHA_SYSTEM_PROMPT + PASSINHA_RESPONSE_RULES
+
+        # Orçamento do histórico: turnos recentes inteiros, os antigos viram um resumo curto
+        self.history_token_budget = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+        self.history_summary_tokens = int(os.getenv("CHAT_HISTORY_SUMMARY_TOKENS", "200"))
+        self.history_max_turns = int(os.getenv("CHAT_HISTORY_MAX_TURNS", "20"))
+        self.message_token_limit = int(os.getenv("CHAT_MESSAGE_TOKEN_LIMIT", "1000"))
+
+        # Backpressure: no máximo N gerações ao mesmo tempo e uma fila limitada
+        self.max_concurrency = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+        self.max_queue = int(os.getenv("CHAT_MAX_QUEUE", "32"))
+        self.queue_timeout = float(os.getenv("CHAT_QUEUE_TIMEOUT", "5"))
+        self._semaphore = None
+        self._active = 0
+        self._waiting = 0
+        self.rejected = 0
+
+        # Orçamento de latência: resposta completa (/api/chat) ou primeiro trecho (stream)
+        self.latency_budget = float(os.getenv("CHAT_LATENCY_BUDGET", "10"))
+        self.first_token_budget = float(os.getenv("CHAT_FIRST_TOKEN_BUDGET", "4"))
+        self.budget_misses = 0
+
+        # Circuit breaker: depois de N falhas seguidas, nem tenta o Gemini por um tempo
+        self.breaker_failures = int(os.getenv("CHAT_BREAKER_FAILURES", "5"))
+        self.breaker_cooldown = float(os.getenv("CHAT_BREAKER_COOLDOWN", "30"))
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
+        self.short_circuited = 0
+
+        self.context_cached = False
+        self._model = None
+        self._model_expires_at = None
+        self._lock = None
+
+    async def get_model(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        if self._model is None or self._is_expired():
+            async with self._lock:
+                if self._model is None or self._is_expired():
+                    # O SDK do Gemini demora para importar: carrega fora do event loop
+                    self._model = await asyncio.to_thread(self._create_model)
+        return self._model
+
+    def _is_expired(self):
+        return self._model_expires_at is not None and time.monotonic() >= self._model_expires_at
+
+    def _create_model(self):
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+        try:
+            from google.generativeai import caching
+
+            cached_content = caching.CachedContent.create(
+                model=self.model_name,
+                display_name="passinha-system-prompt",
+                system_instruction=self.system_instruction,
+                ttl=timedelta(seconds=self.context_cache_ttl)
+            )
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            self.context_cached = True
+            # Renova um minuto antes de o cache expirar no Gemini
+            self._model_expires_at = time.monotonic() + max(self.context_cache_ttl - 60, 60)
+            print("Passinha: system prompt em cache de contexto")
+            return model
+        except Exception as e:
+            # Ex.: prompt abaixo do mínimo de tokens do cache explícito
+            print(f"Passinha: cache de contexto indisponível ({e}), usando system_instruction")
+
+        self.context_cached = False
+        self._model_expires_at = None
+        return genai.GenerativeModel(self.model_name, system_instruction=self.system_instruction)
+
+    # === CONCORRÊNCIA ===
+
+    @asynccontextmanager
+    async def slot(self):
+        """Reserva uma vaga de geração; levanta ChatOverloaded se não der."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if self._active + self._waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise ChatOverloaded("Fila do chat cheia")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ChatOverloaded("Tempo de espera na fila do chat esgotado")
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    def concurrency_stats(self):
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected
+        }
+
+    # === ORÇAMENTO DE LATÊNCIA E CIRCUIT BREAKER ===
+
+    def _check_breaker(self):
+        if time.monotonic() < self._breaker_open_until:
+            self.short_circuited += 1
+            raise ChatOverloaded("Circuito do Gemini aberto")
+
+    def _record_success(self):
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
+
+    def _record_failure(self):
+        # Passado o cool-down o circuito fica meio aberto: a próxima falha já reabre
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.breaker_failures:
+            self._breaker_open_until = time.monotonic() + self.breaker_cooldown
+            print(f"⚠️ Circuito do Gemini aberto por {self.breaker_cooldown:.0f}s "
+                  f"após {self._consecutive_failures} falhas seguidas")
+
+    def _budget_miss(self, budget, what):
+        self.budget_misses += 1
+        self._record_failure()
+        print(f"⏱️ Gemini sem {what} em {budget:.1f}s, respondendo localmente")
+        return ChatOverloaded(f"Orçamento de latência de {budget:.1f}s estourado")
+
+    async def generate(self, model, contents):
+        """Gera a resposta completa em até latency_budget segundos.
+
+        A espera na fila não conta: ela já é limitada por queue_timeout e não
+        deve abrir o circuito quando o problema é carga nossa, não do Gemini.
+        """
+        self._check_breaker()
+        async with self.slot():
+            try:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(contents),
+                    timeout=self.latency_budget
+                )
+                text = response.text
+            except asyncio.TimeoutError:
+                raise self._budget_miss(self.latency_budget, "resposta")
+            except Exception:
+                self._record_failure()
+                raise
+
+        self._record_success()
+        return text
+
+    async def stream(self, model, contents):
+        """Gera os trechos de texto; o primeiro precisa chegar em first_token_budget segundos."""
+        self._check_breaker()
+
+        async with self.slot():
+            deadline = time.monotonic() + self.first_token_budget
+            try:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(contents, stream=True),
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+                chunks = response.__aiter__()
+                first = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                raise self._budget_miss(self.first_token_budget, "primeiro trecho")
+            except StopAsyncIteration:
+                self._record_success()
+                return
+            except Exception:
+                self._record_failure()
+                raise
+
+            yield first.text
+            try:
+                async for chunk in chunks:
+                    yield chunk.text
+            except Exception:
+                self._record_failure()
+                raise
+
+        self._record_success()
+
+    def resilience_stats(self):
+        remaining = self._breaker_open_until - time.monotonic()
+        return {
+            "latency_budget_seconds": self.latency_budget,
+            "first_token_budget_seconds": self.first_token_budget,
+            "budget_misses": self.budget_misses,
+            "consecutive_failures": self._consecutive_failures,
+            "breaker_open": remaining > 0,
+            "breaker_retry_in_seconds": round(max(remaining, 0), 1),
+            "short_circuited": self.short_circuited
+        }
+
+    # === HISTÓRICO ===
+
+    @staticmethod
+    def estimate_tokens(text):
+        # ~4 caracteres por token em português; evita uma chamada ao count_tokens
+        return len(text) // 4 + 1
+
+    @staticmethod
+    def _parse_turn(turn):
+        """Aceita tanto {sender, text} (frontend) quanto {role, content}."""
+        if not isinstance(turn, dict):
+            return None
+
+        role = turn.get("role") or turn.get("sender")
+        text = turn.get("text") or turn.get("content")
+        if not isinstance(text, str) or not text.strip():
+            return None
+
+        role = "user" if role == "user" else "model"
+        return role, text.strip()
+
+    def has_user_turns(self, history):
+        for turn in history or []:
+            parsed = self._parse_turn(turn)
+            if parsed and parsed[0] == "user":
+                return True
+        return False
+
+    def _truncate(self, text, max_tokens):
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[-max_chars:]
+
+    def _summarize(self, older_questions):
+        """Resumo extrativo: o começo das perguntas antigas, das mais novas para trás."""
+        prefix = "Resumo do que a usuária perguntou antes: "
+        available = self.history_summary_tokens * 4 - len(prefix)
+
+        snippets = []
+        for question in reversed(older_questions):
+            snippet = question[:80]
+            if available - len(snippet) - 2 < 0:
+                break
+            snippets.insert(0, snippet)
+            available -= len(snippet) + 2
+
+        return prefix + "; ".join(snippets) if snippets else None
+
+    def build_contents(self, history, message):
+        """Monta o contents do Gemini com tamanho limitado.
+
+        Os turnos mais recentes entram inteiros até history_token_budget; os
+        mais antigos viram um resumo de no máximo history_summary_tokens com
+        o começo de cada pergunta. O prompt total nunca passa de
+        message_token_limit + history_token_budget + history_summary_tokens.
+        """
+        turns = [parsed for parsed in map(self._parse_turn, history or []) if parsed]
+        turns = turns[-self.history_max_turns:] if self.history_max_turns > 0 else []
+
+        kept = []
+        used = 0
+        index = len(turns)
+        while index > 0:
+            role, text = turns[index - 1]
+            cost = self.estimate_tokens(text)
+            if used + cost > self.history_token_budget:
+                break
+            kept.append((role, text))
+            used += cost
+            index -= 1
+        kept.reverse()
+
+        contents = []
+        summary = self._summarize([text for role, text in turns[:index] if role == "user"])
+        if summary:
+            contents.append(("user", summary))
+
+        contents.extend(kept)
+        contents.append(("user", self._truncate(message, self.message_token_limit)))
+
+        # O Gemini espera turnos alternados começando pela usuária
+        while contents and contents[0][0] == "model":
+            contents.pop(0)
+
+        merged = []
+        for role, text in contents:
+            if merged and merged[-1]["role"] == role:
+                merged[-1]["parts"][0] += "\n\n" + text
+            else:
+                merged.append({"role": role, "parts": [text]})
+        return merged
+
+
+passinha_service = PassinhaService()
@@ -0,0 +1,189 @@
+import os
+import asyncio
+from bisect import bisect_left, insort
+from datetime import datetime
+
+from services.database import db
+
+
+def _timestamp(created_at):
+    if not created_at:
+        return 0.0
+    try:
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class RankingService:
+    """Ranking do NEXT FIAP mantido em memória e ordenado.
+
+    As pontuações ficam numa lista ordenada pela mesma ordem do GET antigo
+    (pontos desc, created_at desc) e cada usuária aponta para a chave da sua
+    melhor tentativa, então top N e páginas são fatias da lista e a posição
+    de uma usuária é uma busca binária. A lista é carregada da tabela
+    ranking_next_fiap em segundo plano no startup, atualizada a cada
+    inserção/exclusão feita por esta instância e recarregada a cada
+    RANKING_REFRESH_INTERVAL para pegar o que outras instâncias gravaram. Inserções e exclusões feitas
+    enquanto a recarga lê a tabela ficam registradas e são reaplicadas sobre
+    o índice novo antes da troca, então nada some até a próxima recarga.
+
+    O ranking por jogadora não passa por aqui: a única fonte dele é a tabela
+    ranking_next_fiap_players, mantida por trigger
+    (sql/004_ranking_next_fiap_players.sql).
+    """
+
+    def __init__(self):
+        self.refresh_interval = int(os.getenv("RANKING_REFRESH_INTERVAL", "300"))
+        self.load_batch = int(os.getenv("RANKING_LOAD_BATCH", "1000"))
+
+        self._keys = []
+        self._rows = {}
+        self._user_keys = {}
+        self._lock = asyncio.Lock()
+        self._reload_lock = asyncio.Lock()
+        self._pending = None
+        self._refresh_task = None
+        self.ready = False
+
+    async def start(self):
+        # A primeira carga roda em segundo plano; até ficar ready as rotas
+        # consultam a tabela direto
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"Erro ao carregar ranking do NEXT FIAP: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def reload(self):
+        """Lê a tabela inteira em lotes (o PostgREST corta em 1000 linhas) e troca o índice.
+
+        Os lotes seguem por keyset (id > último id lido), não por offset: uma
+        exclusão entre dois lotes não desloca as linhas seguintes.
+        """
+        async with self._reload_lock:
+            async with self._lock:
+                self._pending = []
+            try:
+                await self._reload()
+            finally:
+                self._pending = None
+
+    async def _reload(self):
+        rows = {}
+        last_id = None
+        while True:
+            query = db.table("ranking_next_fiap").select("*")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            result = await query.order("id").limit(self.load_batch).execute()
+            batch = result.data or []
+            for row in batch:
+                rows[str(row.get("id"))] = row
+            if len(batch) < self.load_batch:
+                break
+            last_id = batch[-1]["id"]
+
+        by_key = {}
+        user_keys = {}
+        for row in rows.values():
+            key = self._key(row)
+            if key in by_key:
+                continue
+            by_key[key] = row
+            user_keys.setdefault(row.get("user_id"), []).append(key)
+        keys = sorted(by_key)
+        for user_entries in user_keys.values():
+            user_entries.sort()
+
+        async with self._lock:
+            self._keys, self._rows, self._user_keys = keys, by_key, user_keys
+            # O que chegou durante a leitura pode não estar nas linhas lidas
+            for apply, arg in self._pending:
+                apply(arg)
+            self._pending = None
+            self.ready = True
+
+    @staticmethod
+    def _key(row):
+        # Menor chave = melhor posição; id desempata linhas iguais
+        return (-(row.get("pontos") or 0), -_timestamp(row.get("created_at")), str(row.get("id")))
+
+    async def add(self, row):
+        async with self._lock:
+            if self._pending is not None:
+                self._pending.append((self._add, row))
+            self._add(row)
+
+    def _add(self, row):
+        key = self._key(row)
+        if key in self._rows:
+            return
+        insort(self._keys, key)
+        self._rows[key] = row
+        insort(self._user_keys.setdefault(row.get("user_id"), []), key)
+
+    async def remove_user(self, user_id):
+        async with self._lock:
+            if self._pending is not None:
+                self._pending.append((self._remove_user, user_id))
+            self._remove_user(user_id)
+
+    def _remove_user(self, user_id):
+        user_entries = self._user_keys.pop(user_id, [])
+        for key in user_entries:
+            self._discard(self._keys, key)
+            self._rows.pop(key, None)
+
+    @staticmethod
+    def _discard(keys, key):
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            del keys[index]
+
+    def count(self):
+        return len(self._keys)
+
+    def page(self, offset=0, limit=None):
+        """Linhas da posição offset em diante (todas se limit for None), já ordenadas."""
+        offset = max(offset, 0)
+        end = None if limit is None else offset + limit
+        return [self._rows[key] for key in self._keys[offset:end]]
+
+    def top(self, n):
+        return self.page(0, n)
+
+    def position(self, user_id):
+        """(posição 1-based, melhor linha) da usuária, ou None se ela não está no ranking."""
+        user_entries = self._user_keys.get(user_id)
+        if not user_entries:
+            return None
+        best = user_entries[0]
+        return bisect_left(self._keys, best) + 1, self._rows[best]
+
+    def user_rows(self, user_id):
+        return [self._rows[key] for key in self._user_keys.get(user_id, [])]
+
+    def stats(self):
+        return {
+            "ready": self.ready,
+            "entries": len(self._keys),
+            "users": len(self._user_keys)
+        }
+
+
+ranking_service = RankingService()
@@ -0,0 +1,235 @@
+import os
+import asyncio
+import math
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from services.database import db
+from services.upload_service import StorageOffsetConflict, UploadTooLarge, upload_service
+
+
+class UploadSessionConflict(Exception):
+    """Sessão já finalizada ou pedaço fora de ordem."""
+
+
+class ResumableUploadService:
+    """Upload retomável de vídeos em pedaços numerados.
+
+    Cada sessão é um upload TUS no Supabase Storage (upload_service.tus_*):
+    o cliente cria a sessão, envia os pedaços em ordem com PUT e cada um vai
+    em streaming como um PATCH no offset certo. O Storage guarda o progresso,
+    então depois de uma queda basta consultar a sessão e continuar do
+    próximo pedaço. Finalizar só confere que o offset chegou ao tamanho
+    total: o arquivo já está montado no bucket, nada é baixado de volta.
+
+    O preço é não ter envio paralelo: o TUS grava no offset seguinte, então
+    um pedaço fora de ordem volta como UploadSessionConflict e o cliente
+    manda um por vez. Paralelo exigiria o multipart S3 do Storage (chaves S3
+    e assinatura SigV4), que o backend não usa.
+
+    O tamanho dos pedaços é o exigido pelo TUS do Supabase (6MB) e o
+    tamanho máximo do vídeo também depende dos limites do projeto e do
+    bucket no Storage (ver upload_service).
+    """
+
+    def __init__(self):
+        self.chunk_size = int(os.getenv("UPLOAD_RESUMABLE_CHUNK_SIZE", str(6 * 1024 * 1024)))
+        self.max_bytes = int(os.getenv("UPLOAD_RESUMABLE_MAX_BYTES", str(500 * 1024 * 1024)))
+        # O Storage descarta uploads TUS não terminados depois de 24h
+        self.session_ttl = int(os.getenv("UPLOAD_SESSION_TTL", "86400"))
+        self.cleanup_interval = int(os.getenv("UPLOAD_SESSION_CLEANUP_INTERVAL", "3600"))
+        self._cleanup_task = None
+
+    async def start(self):
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def stop(self):
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+
+    def _expected_size(self, session, index):
+        if index == session["total_chunks"] - 1:
+            return session["total_size"] - session["chunk_size"] * index
+        return session["chunk_size"]
+
+    @staticmethod
+    def _received(session, offset):
+        """Pedaços completos até offset (o último conta quando o arquivo terminou)."""
+        if offset >= session["total_size"]:
+            return list(range(session["total_chunks"]))
+        return list(range(offset // session["chunk_size"]))
+
+    def _view(self, session, offset):
+        return {
+            "session_id": session["id"],
+            "filename": session["filename"],
+            "status": session["status"],
+            "size": session["total_size"],
+            "chunk_size": session["chunk_size"],
+            "total_chunks": session["total_chunks"],
+            "received_chunks": self._received(session, offset),
+            "offset": offset,
+            "url": session.get("url"),
+            "expires_at": session["expires_at"]
+        }
+
+    async def create(self, filename, content_type, size):
+        if not content_type or not content_type.startswith("video/"):
+            raise ValueError("Upload retomável é só para vídeos")
+        if size <= 0:
+            raise ValueError("Tamanho do arquivo inválido")
+        if size > self.max_bytes:
+            raise UploadTooLarge(f"Arquivo muito grande. Máximo {self.max_bytes // (1024 * 1024)}MB permitido.")
+
+        extension = filename.split('.')[-1]
+        storage_path = f"{uuid.uuid4()}.{extension}"
+        tus_url = await upload_service.tus_create(storage_path, size, content_type)
+
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.session_ttl)
+        result = await db.table("upload_sessions").insert({
+            "filename": storage_path,
+            "content_type": content_type,
+            "total_size": size,
+            "chunk_size": self.chunk_size,
+            "total_chunks": math.ceil(size / self.chunk_size),
+            "tus_url": tus_url,
+            "expires_at": expires_at.isoformat()
+        }).execute()
+
+        if not result.data:
+            await upload_service.tus_terminate(tus_url)
+            raise RuntimeError("Erro ao criar sessão de upload")
+        return self._view(result.data[0], 0)
+
+    async def _load(self, session_id):
+        result = await db.table("upload_sessions").select("*").eq("id", session_id).execute()
+        if not result.data:
+            raise LookupError("Sessão de upload não encontrada")
+
+        session = result.data[0]
+        expires_at = datetime.fromisoformat(session["expires_at"].replace("Z", "+00:00"))
+        if session["status"] != "complete" and expires_at < datetime.now(timezone.utc):
+            raise LookupError("Sessão de upload expirada")
+        if session["status"] != "complete" and not session.get("tus_url"):
+            # Criada antes do upload TUS: o cliente começa uma sessão nova
+            raise LookupError("Sessão de upload antiga, envie o arquivo de novo")
+        return session
+
+    async def _offset(self, session):
+        if session["status"] == "complete":
+            return session["total_size"]
+        return await upload_service.tus_offset(session["tus_url"])
+
+    async def get(self, session_id):
+        session = await self._load(session_id)
+        return self._view(session, await self._offset(session))
+
+    async def put_chunk(self, session_id, index, body, content_length):
+        """Grava o pedaço index vindo do corpo da requisição (iterador assíncrono)."""
+        session = await self._load(session_id)
+        if session["status"] != "open":
+            raise UploadSessionConflict("Sessão de upload já finalizada")
+        if not 0 <= index < session["total_chunks"]:
+            raise ValueError(f"Pedaço {index} fora do intervalo 0-{session['total_chunks'] - 1}")
+
+        expected = self._expected_size(session, index)
+        if content_length != expected:
+            raise ValueError(f"Pedaço {index} deve ter {expected} bytes (Content-Length {content_length})")
+
+        start = index * session["chunk_size"]
+        offset = await upload_service.tus_offset(session["tus_url"])
+        if offset >= start + expected:
+            # Reenvio de um pedaço que já chegou (ex.: a resposta se perdeu)
+            return {"chunk": index, "size": expected, "offset": offset}
+        if offset != start:
+            raise UploadSessionConflict(f"Pedaço fora de ordem: o próximo é {offset // session['chunk_size']}")
+
+        try:
+            offset = await upload_service.tus_patch(session["tus_url"], start, self._limited(body, expected), expected)
+        except StorageOffsetConflict:
+            raise UploadSessionConflict("Outro envio deste pedaço chegou antes")
+        return {"chunk": index, "size": expected, "offset": offset}
+
+    @staticmethod
+    async def _limited(body, size):
+        received = 0
+        async for block in body:
+            received += len(block)
+            if received > size:
+                raise ValueError("Pedaço maior que o Content-Length")
+            yield block
+        if received != size:
+            raise ValueError("Pedaço incompleto")
+
+    async def complete(self, session_id):
+        """Confere que o Storage recebeu tudo e marca a sessão; idempotente."""
+        session = await self._load(session_id)
+        if session["status"] == "complete":
+            return self._result(session)
+
+        offset = await upload_service.tus_offset(session["tus_url"])
+        if offset < session["total_size"]:
+            raise ValueError(
+                f"Upload incompleto: {offset} de {session['total_size']} bytes, "
+                f"próximo pedaço {offset // session['chunk_size']}"
+            )
+
+        url = await upload_service.public_url(session["filename"])
+        updated = await db.table("upload_sessions")\
+            .update({"status": "complete", "url": url})\
+            .eq("id", session_id)\
+            .execute()
+        return self._result(updated.data[0] if updated.data else {**session, "url": url})
+
+    @staticmethod
+    def _result(session):
+        # Mesmo formato da resposta do /upload
+        return {
+            "success": True,
+            "url": session["url"],
+            "filename": session["filename"],
+            "size": session["total_size"],
+            "type": "video"
+        }
+
+    async def abort(self, session_id):
+        session = await self._load(session_id)
+        if session["status"] == "complete":
+            raise UploadSessionConflict("Sessão de upload já finalizada")
+
+        await upload_service.tus_terminate(session["tus_url"])
+        await db.table("upload_sessions").delete().eq("id", session_id).execute()
+
+    async def _cleanup_loop(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self._cleanup_expired()
+            except Exception as e:
+                print(f"Erro ao limpar sessões de upload expiradas: {e}")
+
+    async def _cleanup_expired(self):
+        now = datetime.now(timezone.utc).isoformat()
+        result = await db.table("upload_sessions")\
+            .select("id, tus_url")\
+            .lt("expires_at", now)\
+            .neq("status", "complete")\
+            .limit(100)\
+            .execute()
+
+        for session in result.data or []:
+            if session.get("tus_url"):
+                await upload_service.tus_terminate(session["tus_url"])
+            await db.table("upload_sessions").delete().eq("id", session["id"]).execute()
+
+        if result.data:
+            print(f"Upload: {len(result.data)} sessões expiradas removidas")
+
+
+resumable_uploads = ResumableUploadService()
@@ -0,0 +1,128 @@
+import re
+
+
+EMPTY_RESPONSE = "Desculpe, não consegui processar sua pergunta. Pode reformular?"
+SHORT_RESPONSE = "Olá! Sou a Passinha. Posso te ajudar com dúvidas sobre a plataforma, treinos ou receitas para atletas. O que você gostaria de saber?"
+
+_SPACES = re.compile(r" {2,}")
+_NUMBERED = re.compile(r"\d+\.\s*")
+# Fim de trecho que ainda pode virar marcador quando o próximo pedaço chegar
+_HOLD_CHARS = " \t*•-"
+# Começo de linha que ainda pode virar item numerado ("**1.** ")
+_LINE_START_CHARS = frozenset(" \t*•-0123456789.")
+
+
+def _strip_markup(text):
+    """Tira *, • e "- " e junta espaços repetidos de um trecho de linha."""
+    if "*" in text or "•" in text or "-" in text:
+        text = text.replace("*", "").replace("•", "").replace("- ", "")
+    if "  " in text:
+        text = _SPACES.sub(" ", text)
+    return text
+
+
+def _strip_numbering(line):
+    if line[:1].isdigit():
+        numbered = _NUMBERED.match(line)
+        if numbered:
+            return line[numbered.end():]
+    return line
+
+
+def sanitize_text(text):
+    """Remove o markdown de um texto completo, uma linha por vez."""
+    out = []
+    blank = False
+    for line in text.split("\n"):
+        line = _strip_numbering(_strip_markup(line)).strip()
+        if not line:
+            # Sequências de linhas em branco viram uma só
+            blank = True
+            continue
+        if out:
+            out.append("\n\n" if blank else "\n")
+        out.append(line)
+        blank = False
+    return "".join(out)
+
+
+def sanitize_response(text):
+    """Limpa a resposta completa do Gemini, com as respostas padrão para texto vazio ou curto."""
+    if not text:
+        return EMPTY_RESPONSE
+
+    cleaned = sanitize_text(text)
+    if len(cleaned) < 10:
+        return SHORT_RESPONSE
+    return cleaned
+
+
+class StreamSanitizer:
+    """Versão incremental do sanitize_text para as respostas em streaming.
+
+    Não espera a linha terminar: cada pedaço sai limpo assim que chega. Só
+    fica guardado o que ainda pode mudar com o próximo pedaço - o fim do
+    trecho que pode ser marcador partido ("*" + "*negrito", "-" + " item") e
+    o começo da linha enquanto ainda pode ser um item numerado. A saída final
+    é igual à do sanitize_text sobre o texto inteiro.
+    """
+
+    def __init__(self):
+        self._tail = ""
+        self._at_line_start = True
+        self._line_open = False
+        self._started = False
+        self._pending_blank = False
+
+    def feed(self, chunk):
+        *lines, tail = (self._tail + chunk).split("\n")
+
+        out = []
+        for line in lines:
+            self._tail = line
+            out.append(self._emit(end_of_line=True))
+
+        self._tail = tail
+        out.append(self._emit(end_of_line=False))
+        return "".join(out)
+
+    def flush(self):
+        return self._emit(end_of_line=True)
+
+    def _emit(self, end_of_line):
+        text = self._tail
+
+        if end_of_line:
+            ready, self._tail = text, ""
+        else:
+            if self._at_line_start and _LINE_START_CHARS.issuperset(text):
+                return ""
+            cut = len(text.rstrip(_HOLD_CHARS))
+            ready, self._tail = text[:cut], text[cut:]
+
+        cleaned = _strip_markup(ready)
+        if self._at_line_start:
+            cleaned = _strip_numbering(cleaned)
+            self._at_line_start = False
+        if not self._line_open:
+            cleaned = cleaned.lstrip()
+        if end_of_line:
+            cleaned = cleaned.rstrip()
+
+        out = ""
+        if cleaned:
+            if not self._line_open:
+                if self._started:
+                    out = "\n\n" if self._pending_blank else "\n"
+                self._started = True
+                self._pending_blank = False
+                self._line_open = True
+            out += cleaned
+
+        if end_of_line:
+            if not self._line_open and self._started:
+                self._pending_blank = True
+            self._at_line_start = True
+            self._line_open = False
+
+        return out
@@ -0,0 +1,315 @@
+import os
+import asyncio
+import base64
+import tempfile
+import uuid
+from urllib.parse import urljoin
+
+import httpx
+from multipart.multipart import MultipartParser, parse_options_header
+
+from services.database import db
+
+
+STORAGE_BUCKET = "posts-media"
+
+
+def remove_local_file(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class UploadTooLarge(Exception):
+    """Arquivo passou do limite de tamanho durante a leitura."""
+
+
+class StorageOffsetConflict(Exception):
+    """O Storage recusou o offset de um PATCH TUS (outro envio chegou antes)."""
+
+
+class UploadService:
+    """Envia arquivos para o Supabase Storage sem carregar tudo na memória.
+
+    O corpo multipart do /upload é lido direto de request.stream() e passado
+    por um parser incremental: só o campo do arquivo vai para um arquivo
+    temporário em disco e o limite de tamanho é checado a cada pedaço que
+    chega da rede, então um upload grande demais (inclusive chunked, sem
+    Content-Length) é recusado assim que passa do limite. Do disco o arquivo
+    vai para o Storage também em streaming, em pedaços de UPLOAD_CHUNK_SIZE.
+
+    Os bytes para o Storage passam por um httpx.AsyncClient próprio
+    (UPLOAD_STORAGE_CONNECTIONS conexões, timeout UPLOAD_STORAGE_TIMEOUT),
+    separado do pool do PostgREST: uploads lentos não seguram as conexões
+    das consultas ao banco.
+    """
+
+    def __init__(self):
+        self.max_bytes = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+        self.chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+        self.spool_dir = os.getenv("UPLOAD_SPOOL_DIR") or None
+        self.storage_timeout = float(os.getenv("UPLOAD_STORAGE_TIMEOUT", "120"))
+        self.storage_connections = int(os.getenv("UPLOAD_STORAGE_CONNECTIONS", "10"))
+        # Folga para o envelope multipart (boundary, cabeçalhos do campo)
+        self.max_request_bytes = self.max_bytes + 64 * 1024
+        self._http = None
+
+    async def start(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.storage_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.storage_connections,
+                    max_keepalive_connections=self.storage_connections
+                )
+            )
+
+    async def stop(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @property
+    def http(self):
+        if self._http is None:
+            raise RuntimeError("UploadService não iniciado - chame upload_service.start() no startup")
+        return self._http
+
+    def too_large_message(self):
+        return f"Arquivo muito grande. Máximo {self.max_bytes // (1024 * 1024)}MB permitido."
+
+    async def receive(self, request, field="file", allowed_types=("image/", "video/")):
+        """Lê o multipart da requisição e grava o campo field em disco.
+
+        Retorna (caminho, tamanho, nome original, content-type). Levanta
+        UploadTooLarge assim que o arquivo ou o corpo passam do limite e
+        ValueError se o corpo não trouxer um arquivo de um tipo aceito.
+        """
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise ValueError("Envie o arquivo como multipart/form-data")
+
+        part = {"headers": {}, "name": b"", "value": b"", "is_file": False}
+        received = {"path": None, "filename": None, "content_type": None, "size": 0}
+        pending = []
+
+        def on_part_begin():
+            part.update(headers={}, name=b"", value=b"", is_file=False)
+
+        def on_header_field(data, start, end):
+            part["name"] += data[start:end]
+
+        def on_header_value(data, start, end):
+            part["value"] += data[start:end]
+
+        def on_header_end():
+            part["headers"][part["name"].lower()] = part["value"]
+            part["name"], part["value"] = b"", b""
+
+        def on_headers_finished():
+            disposition, options = parse_options_header(part["headers"].get(b"content-disposition", b""))
+            # Só o primeiro campo de arquivo com o nome esperado é aceito
+            if options.get(b"name") == field.encode() and b"filename" in options and received["filename"] is None:
+                received["filename"] = options[b"filename"].decode("utf-8", "replace")
+                received["content_type"] = part["headers"].get(b"content-type", b"application/octet-stream").decode("latin-1")
+                part["is_file"] = True
+
+        def on_part_data(data, start, end):
+            if part["is_file"]:
+                pending.append(data[start:end])
+                received["size"] += end - start
+
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        })
+
+        spooled = None
+        body_size = 0
+        try:
+            async for chunk in request.stream():
+                body_size += len(chunk)
+                if body_size > self.max_request_bytes:
+                    raise UploadTooLarge(self.too_large_message())
+                parser.write(chunk)
+
+                if received["filename"] is not None and spooled is None:
+                    if not received["content_type"].startswith(allowed_types):
+                        raise ValueError("Apenas imagens e vídeos são permitidos")
+                    spooled = await asyncio.to_thread(
+                        tempfile.NamedTemporaryFile, dir=self.spool_dir, prefix="upload-", delete=False
+                    )
+                if received["size"] > self.max_bytes:
+                    raise UploadTooLarge(self.too_large_message())
+                if pending:
+                    data = b"".join(pending)
+                    pending.clear()
+                    await asyncio.to_thread(spooled.write, data)
+            parser.finalize()
+        except BaseException:
+            if spooled is not None:
+                self._discard(spooled)
+            raise
+
+        if spooled is None:
+            raise ValueError(f"Campo '{field}' com o arquivo não encontrado")
+
+        await asyncio.to_thread(spooled.close)
+        return spooled.name, received["size"], received["filename"], received["content_type"]
+
+    @staticmethod
+    def _discard(spooled):
+        spooled.close()
+        remove_local_file(spooled.name)
+
+    async def store(self, local_path, storage_path, content_type):
+        """Envia um arquivo do disco para o bucket em streaming e retorna a URL pública."""
+        size = await asyncio.to_thread(os.path.getsize, local_path)
+        response = await self.http.post(
+            self._object_url(storage_path),
+            content=self._file_chunks(local_path),
+            headers=self._storage_headers({
+                "content-type": content_type,
+                "content-length": str(size),
+                "x-upsert": "true"
+            })
+        )
+        if response.status_code >= 400:
+            raise RuntimeError(f"Erro ao fazer upload para o storage ({response.status_code}): {response.text}")
+        return await self.public_url(storage_path)
+
+    async def _file_chunks(self, local_path):
+        with open(local_path, "rb") as body:
+            while True:
+                block = await asyncio.to_thread(body.read, self.chunk_size)
+                if not block:
+                    break
+                yield block
+
+    async def public_url(self, storage_path):
+        return await db.storage.from_(STORAGE_BUCKET).get_public_url(storage_path)
+
+    @staticmethod
+    def _storage_url(path):
+        return f"{os.getenv('SUPABASE_URL').rstrip('/')}/storage/v1/{path}"
+
+    def _object_url(self, storage_path):
+        return self._storage_url(f"object/{STORAGE_BUCKET}/{storage_path}")
+
+    @staticmethod
+    def _storage_headers(extra=None):
+        key = os.getenv("SUPABASE_KEY")
+        return {"apikey": key, "authorization": f"Bearer {key}", **(extra or {})}
+
+    # === UPLOAD RETOMÁVEL (TUS) DO SUPABASE STORAGE ===
+    #
+    # O Storage junta os pedaços sozinho: cada PATCH grava a partir de
+    # Upload-Offset e o objeto aparece no bucket quando o offset chega ao
+    # tamanho total. O Supabase exige pedaços de exatamente 6MB (menos o
+    # último) e expira uploads não terminados em 24h. O objeto final ainda
+    # respeita o "Upload file size limit" do projeto (50MB no plano free)
+    # e o file_size_limit do bucket, que precisam ser pelo menos
+    # UPLOAD_RESUMABLE_MAX_BYTES.
+
+    @staticmethod
+    def _tus_headers(extra=None):
+        return UploadService._storage_headers({"tus-resumable": "1.0.0", **(extra or {})})
+
+    async def tus_create(self, storage_path, size, content_type):
+        """Abre um upload TUS para storage_path e retorna a URL dele."""
+        metadata = ",".join(
+            f"{name} {base64.b64encode(value.encode()).decode()}"
+            for name, value in (
+                ("bucketName", STORAGE_BUCKET),
+                ("objectName", storage_path),
+                ("contentType", content_type),
+            )
+        )
+        response = await self.http.post(
+            self._storage_url("upload/resumable"),
+            headers=self._tus_headers({
+                "upload-length": str(size),
+                "upload-metadata": metadata,
+                "x-upsert": "true"
+            })
+        )
+        if response.status_code == 413:
+            raise UploadTooLarge("Arquivo maior que o limite do storage")
+        response.raise_for_status()
+        return urljoin(str(response.url), response.headers["location"])
+
+    async def tus_offset(self, upload_url):
+        """Bytes já gravados no upload; LookupError se ele expirou."""
+        response = await self.http.head(upload_url, headers=self._tus_headers())
+        if response.status_code in (404, 410):
+            raise LookupError("Upload expirado no storage")
+        response.raise_for_status()
+        return int(response.headers["upload-offset"])
+
+    async def tus_patch(self, upload_url, offset, chunks, size):
+        """Grava size bytes (iterador assíncrono) a partir de offset; retorna o novo offset.
+
+        Levanta StorageOffsetConflict se o storage recusar o offset.
+        """
+        response = await self.http.patch(
+            upload_url,
+            content=chunks,
+            headers=self._tus_headers({
+                "upload-offset": str(offset),
+                "content-type": "application/offset+octet-stream",
+                "content-length": str(size)
+            })
+        )
+        if response.status_code == 409:
+            raise StorageOffsetConflict("Offset recusado pelo storage")
+        response.raise_for_status()
+        return int(response.headers["upload-offset"])
+
+    async def tus_terminate(self, upload_url):
+        try:
+            await self.http.delete(upload_url, headers=self._tus_headers())
+        except httpx.HTTPError as e:
+            print(f"Erro ao cancelar upload no storage: {e}")
+
+    async def remove(self, storage_paths):
+        if storage_paths:
+            await db.storage.from_(STORAGE_BUCKET).remove(storage_paths)
+
+    async def upload(self, request, accepts=None, process=None):
+        """Recebe o arquivo do multipart, envia ao storage e retorna os dados do /upload.
+
+        Se accepts(content_type) for verdadeiro, process(local_path, filename)
+        recebe a cópia em disco depois do envio (e passa a ser dona dela) e
+        devolve as URLs das variantes geradas a partir do arquivo.
+        """
+        local_path, size, original_name, content_type = await self.receive(request)
+        extension = original_name.split('.')[-1]
+        unique_filename = f"{uuid.uuid4()}.{extension}"
+
+        variants = None
+        try:
+            file_url = await self.store(local_path, unique_filename, content_type)
+            if process is not None and accepts is not None and accepts(content_type):
+                variants = await process(local_path, unique_filename)
+                local_path = None
+        finally:
+            if local_path is not None:
+                await asyncio.to_thread(remove_local_file, local_path)
+
+        result = {
+            "success": True,
+            "url": file_url,
+            "filename": unique_filename,
+            "size": size,
+            "type": content_type.split('/')[0]  # 'image' ou 'video'
+        }
+        if variants:
+            result["variants"] = variants
+        return result
+
+upload_service = UploadService()
@@ -0,0 +1,46 @@
+-- Like/unlike atômico em uma única chamada (usado por POST /posts/like).
+-- Rodar no SQL Editor do Supabase.
+
+create unique index if not exists post_likes_post_id_user_id_key
+    on post_likes (post_id, user_id);
+
+create or replace function toggle_post_like(p_post_id uuid, p_user_id uuid)
+returns json
+language plpgsql
+as $$
+declare
+    v_changed integer;
+    v_liked boolean;
+    v_count integer;
+begin
+    delete from post_likes
+    where post_id = p_post_id and user_id = p_user_id;
+    get diagnostics v_changed = row_count;
+
+    if v_changed > 0 then
+        v_liked := false;
+        update posts
+        set likes_count = greatest(coalesce(likes_count, 0) - 1, 0)
+        where id = p_post_id
+        returning likes_count into v_count;
+    else
+        v_liked := true;
+        insert into post_likes (post_id, user_id)
+        values (p_post_id, p_user_id)
+        on conflict (post_id, user_id) do nothing;
+        get diagnostics v_changed = row_count;
+
+        if v_changed > 0 then
+            update posts
+            set likes_count = coalesce(likes_count, 0) + 1
+            where id = p_post_id
+            returning likes_count into v_count;
+        else
+            -- Outra requisição concorrente já curtiu: só lê o contador
+            select likes_count into v_count from posts where id = p_post_id;
+        end if;
+    end if;
+
+    return json_build_object('liked', v_liked, 'likes_count', v_count);
+end;
+$$;
@@ -0,0 +1,89 @@
+-- Timeline materializada por usuário (fan-out na escrita) usada por GET /feed/{user_id}.
+-- Rodar no SQL Editor do Supabase.
+
+create table if not exists user_feed (
+    user_id uuid not null,
+    post_id uuid not null references posts (id) on delete cascade,
+    created_at timestamptz not null,
+    primary key (user_id, post_id)
+);
+
+create index if not exists user_feed_user_id_created_at_idx
+    on user_feed (user_id, created_at desc, post_id desc);
+
+-- Autoras com seguidores demais para fan-out: os posts delas são puxados na leitura
+create table if not exists feed_pull_authors (
+    author_id uuid primary key,
+    followers_count integer not null,
+    updated_at timestamptz not null default now()
+);
+
+create index if not exists user_follows_following_id_idx
+    on user_follows (following_id);
+
+create or replace function fanout_post(
+    p_post_id uuid,
+    p_author_id uuid,
+    p_created_at timestamptz,
+    p_max_followers integer
+)
+returns json
+language plpgsql
+as $$
+declare
+    v_followers integer;
+begin
+    select count(*) into v_followers
+    from user_follows
+    where following_id = p_author_id;
+
+    -- A própria autora sempre vê o post na sua timeline
+    insert into user_feed (user_id, post_id, created_at)
+    values (p_author_id, p_post_id, p_created_at)
+    on conflict do nothing;
+
+    if v_followers > p_max_followers then
+        insert into feed_pull_authors (author_id, followers_count, updated_at)
+        values (p_author_id, v_followers, now())
+        on conflict (author_id) do update
+        set followers_count = excluded.followers_count, updated_at = now();
+
+        return json_build_object('mode', 'pull', 'followers', v_followers);
+    end if;
+
+    delete from feed_pull_authors where author_id = p_author_id;
+
+    insert into user_feed (user_id, post_id, created_at)
+    select follower_id, p_post_id, p_created_at
+    from user_follows
+    where following_id = p_author_id
+    on conflict do nothing;
+
+    return json_build_object('mode', 'push', 'followers', v_followers);
+end;
+$$;
+
+-- Mantém só as p_timeline_size entradas mais recentes de cada timeline
+create or replace function trim_user_feeds(p_timeline_size integer)
+returns integer
+language plpgsql
+as $$
+declare
+    v_removed integer;
+begin
+    delete from user_feed f
+    using (
+        select user_id, post_id
+        from (
+            select user_id, post_id,
+                   row_number() over (partition by user_id order by created_at desc, post_id desc) as position
+            from user_feed
+        ) ranked
+        where ranked.position > p_timeline_size
+    ) old
+    where f.user_id = old.user_id and f.post_id = old.post_id;
+
+    get diagnostics v_removed = row_count;
+    return v_removed;
+end;
+$$;
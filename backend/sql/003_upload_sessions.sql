@@ -0,0 +1,30 @@
+-- Sessões de upload retomável (vídeos) usadas por /uploads/sessions.
+-- Cada pedaço vai direto para o storage em uploads/<sessão>/<índice>.part;
+-- estas tabelas guardam quais pedaços já chegaram para o cliente continuar.
+-- Rodar no SQL Editor do Supabase.
+
+create table if not exists upload_sessions (
+    id uuid primary key default gen_random_uuid(),
+    filename text not null,
+    content_type text not null,
+    total_size bigint not null,
+    chunk_size integer not null,
+    total_chunks integer not null,
+    status text not null default 'open', -- open | finalizing | complete
+    url text,
+    created_at timestamptz not null default now(),
+    expires_at timestamptz not null
+);
+
+create index if not exists upload_sessions_expires_at_idx
+    on upload_sessions (expires_at)
+    where status <> 'complete';
+
+-- Uma linha por pedaço: PUTs em paralelo não disputam a mesma linha
+create table if not exists upload_session_chunks (
+    session_id uuid not null references upload_sessions (id) on delete cascade,
+    chunk_index integer not null,
+    size integer not null,
+    created_at timestamptz not null default now(),
+    primary key (session_id, chunk_index)
+);
@@ -0,0 +1,88 @@
+-- Ranking do NEXT FIAP agregado por jogadora usado por GET /api/ranking-next-fiap/players.
+-- Cada tentativa continua em ranking_next_fiap; o trigger mantém aqui uma linha
+-- por usuário com a melhor pontuação, o número de tentativas e a última jogada.
+-- Rodar no SQL Editor do Supabase.
+
+create table if not exists ranking_next_fiap_players (
+    user_id uuid primary key,
+    nome text,
+    pontos integer not null default 0,
+    acertos integer not null default 0,
+    best_at timestamptz not null,
+    attempts integer not null default 0,
+    last_played_at timestamptz not null
+);
+
+create index if not exists ranking_next_fiap_players_order_idx
+    on ranking_next_fiap_players (pontos desc, best_at desc, user_id);
+
+create index if not exists ranking_next_fiap_user_id_idx
+    on ranking_next_fiap (user_id);
+
+create or replace function ranking_next_fiap_players_on_insert()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into ranking_next_fiap_players as p
+        (user_id, nome, pontos, acertos, best_at, attempts, last_played_at)
+    values
+        (new.user_id, new.nome, coalesce(new.pontos, 0), coalesce(new.acertos, 0),
+         new.created_at, 1, new.created_at)
+    on conflict (user_id) do update
+    set attempts = p.attempts + 1,
+        last_played_at = greatest(p.last_played_at, excluded.last_played_at),
+        -- Mesma ordem do ranking: mais pontos, depois a tentativa mais recente
+        nome = case when (excluded.pontos, excluded.best_at) > (p.pontos, p.best_at)
+                    then excluded.nome else p.nome end,
+        acertos = case when (excluded.pontos, excluded.best_at) > (p.pontos, p.best_at)
+                       then excluded.acertos else p.acertos end,
+        best_at = case when (excluded.pontos, excluded.best_at) > (p.pontos, p.best_at)
+                       then excluded.best_at else p.best_at end,
+        pontos = greatest(p.pontos, excluded.pontos);
+    return new;
+end;
+$$;
+
+-- Exclusão é rara (admin): recalcula só a jogadora afetada
+create or replace function ranking_next_fiap_players_on_delete()
+returns trigger
+language plpgsql
+as $$
+begin
+    delete from ranking_next_fiap_players where user_id = old.user_id;
+
+    insert into ranking_next_fiap_players
+        (user_id, nome, pontos, acertos, best_at, attempts, last_played_at)
+    select distinct on (user_id)
+        user_id, nome, coalesce(pontos, 0), coalesce(acertos, 0), created_at,
+        count(*) over (partition by user_id),
+        max(created_at) over (partition by user_id)
+    from ranking_next_fiap
+    where user_id = old.user_id
+    order by user_id, coalesce(pontos, 0) desc, created_at desc;
+
+    return old;
+end;
+$$;
+
+drop trigger if exists ranking_next_fiap_players_insert on ranking_next_fiap;
+create trigger ranking_next_fiap_players_insert
+    after insert on ranking_next_fiap
+    for each row execute function ranking_next_fiap_players_on_insert();
+
+drop trigger if exists ranking_next_fiap_players_delete on ranking_next_fiap;
+create trigger ranking_next_fiap_players_delete
+    after delete on ranking_next_fiap
+    for each row execute function ranking_next_fiap_players_on_delete();
+
+-- Carga inicial a partir das tentativas já gravadas
+insert into ranking_next_fiap_players
+    (user_id, nome, pontos, acertos, best_at, attempts, last_played_at)
+select distinct on (user_id)
+    user_id, nome, coalesce(pontos, 0), coalesce(acertos, 0), created_at,
+    count(*) over (partition by user_id),
+    max(created_at) over (partition by user_id)
+from ranking_next_fiap
+order by user_id, coalesce(pontos, 0) desc, created_at desc
+on conflict (user_id) do nothing;
@@ -0,0 +1,121 @@
+-- Contadores do painel admin (GET /admin/stats) mantidos por trigger.
+-- Cada insert/delete em users, posts e comments ajusta uma linha de
+-- admin_counters; post_authors guarda quantos posts cada usuário tem, e
+-- active_users conta quem tem pelo menos um. Ler as estatísticas vira uma
+-- consulta de quatro linhas, qualquer que seja o tamanho das tabelas.
+-- Rodar no SQL Editor do Supabase.
+
+create table if not exists admin_counters (
+    name text primary key,
+    value bigint not null default 0
+);
+
+create table if not exists post_authors (
+    user_id uuid primary key,
+    posts_count integer not null
+);
+
+create or replace function bump_admin_counter(p_name text, p_delta bigint)
+returns void
+language sql
+as $$
+    insert into admin_counters (name, value)
+    values (p_name, greatest(p_delta, 0))
+    on conflict (name) do update
+    set value = greatest(admin_counters.value + p_delta, 0);
+$$;
+
+create or replace function admin_counters_on_users()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform bump_admin_counter('total_users', case when tg_op = 'INSERT' then 1 else -1 end);
+    return null;
+end;
+$$;
+
+create or replace function admin_counters_on_comments()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform bump_admin_counter('total_comments', case when tg_op = 'INSERT' then 1 else -1 end);
+    return null;
+end;
+$$;
+
+create or replace function admin_counters_on_posts()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_remaining integer;
+begin
+    if tg_op = 'INSERT' then
+        perform bump_admin_counter('total_posts', 1);
+        if new.user_id is null then
+            return null;
+        end if;
+
+        insert into post_authors (user_id, posts_count)
+        values (new.user_id, 1)
+        on conflict (user_id) do update
+        set posts_count = post_authors.posts_count + 1
+        returning posts_count into v_remaining;
+
+        if v_remaining = 1 then
+            perform bump_admin_counter('active_users', 1);
+        end if;
+    else
+        perform bump_admin_counter('total_posts', -1);
+
+        update post_authors
+        set posts_count = posts_count - 1
+        where user_id = old.user_id
+        returning posts_count into v_remaining;
+
+        if v_remaining is not null and v_remaining <= 0 then
+            delete from post_authors where user_id = old.user_id;
+            perform bump_admin_counter('active_users', -1);
+        end if;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists admin_counters_users on users;
+create trigger admin_counters_users
+    after insert or delete on users
+    for each row execute function admin_counters_on_users();
+
+drop trigger if exists admin_counters_posts on posts;
+create trigger admin_counters_posts
+    after insert or delete on posts
+    for each row execute function admin_counters_on_posts();
+
+drop trigger if exists admin_counters_comments on comments;
+create trigger admin_counters_comments
+    after insert or delete on comments
+    for each row execute function admin_counters_on_comments();
+
+-- Recontagem completa: carga inicial e correção manual se algo divergir
+create or replace function refresh_admin_counters()
+returns void
+language plpgsql
+as $$
+begin
+    delete from post_authors;
+    insert into post_authors (user_id, posts_count)
+    select user_id, count(*) from posts where user_id is not null group by user_id;
+
+    insert into admin_counters (name, value) values
+        ('total_users', (select count(*) from users)),
+        ('total_posts', (select count(*) from posts)),
+        ('total_comments', (select count(*) from comments)),
+        ('active_users', (select count(*) from post_authors))
+    on conflict (name) do update set value = excluded.value;
+end;
+$$;
+
+select refresh_admin_counters();
@@ -0,0 +1,6 @@
+-- URLs das variantes WebP (thumbnail, feed, full) devolvidas pelo /upload.
+-- O feed só pede uma variante quando o post tem esta coluna preenchida;
+-- posts antigos, GIFs e SVGs ficam com null e usam a imagem original.
+-- Rodar no SQL Editor do Supabase.
+
+alter table posts add column if not exists image_variants jsonb;
@@ -0,0 +1,11 @@
+-- Sessões de upload retomável passam a usar o upload TUS do Supabase Storage:
+-- o Storage guarda o offset de cada upload e junta os pedaços, então a lista
+-- de pedaços recebidos (upload_session_chunks) não é mais usada.
+-- Rodar no SQL Editor do Supabase depois do 003_upload_sessions.sql.
+
+alter table upload_sessions add column if not exists tus_url text;
+
+-- open | complete (o status 'finalizing' não existe mais)
+update upload_sessions set status = 'open' where status = 'finalizing';
+
+drop table if exists upload_session_chunks;
@@ -0,0 +1,29 @@
+-- Ranking por jogadora: ranking_next_fiap_players passa a ser a única fonte
+-- de GET /api/ranking-next-fiap/players e da posição por jogadora (o índice
+-- em memória do backend não guarda mais essa agregação).
+-- Empate em (pontos, created_at) entre tentativas da mesma usuária: vale a
+-- de menor id, a primeira gravada. O trigger de insert já mantém a linha
+-- existente nesse caso; aqui a recontagem depois de uma exclusão passa a
+-- usar o mesmo desempate em vez de escolher qualquer uma.
+-- Rodar no SQL Editor do Supabase.
+
+create or replace function ranking_next_fiap_players_on_delete()
+returns trigger
+language plpgsql
+as $$
+begin
+    delete from ranking_next_fiap_players where user_id = old.user_id;
+
+    insert into ranking_next_fiap_players
+        (user_id, nome, pontos, acertos, best_at, attempts, last_played_at)
+    select distinct on (user_id)
+        user_id, nome, coalesce(pontos, 0), coalesce(acertos, 0), created_at,
+        count(*) over (partition by user_id),
+        max(created_at) over (partition by user_id)
+    from ranking_next_fiap
+    where user_id = old.user_id
+    order by user_id, coalesce(pontos, 0) desc, created_at desc, id;
+
+    return old;
+end;
+$$;
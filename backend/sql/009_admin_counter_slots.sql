@@ -0,0 +1,47 @@
+-- Contadores do admin divididos em slots (substitui admin_counters do 005).
+-- Com uma linha só por contador, todo insert/delete em posts, comments e
+-- users disputava o lock da mesma linha até o fim da transação. Agora cada
+-- contador tem 16 linhas (slots), o trigger soma o delta numa
+-- delas escolhida ao acaso e o backend soma os slots na leitura. Um slot
+-- sozinho pode ficar negativo; só o total faz sentido.
+-- Rodar no SQL Editor do Supabase.
+
+create table if not exists admin_counter_slots (
+    name text not null,
+    slot smallint not null,
+    value bigint not null default 0,
+    primary key (name, slot)
+);
+
+create or replace function bump_admin_counter(p_name text, p_delta bigint)
+returns void
+language sql
+as $$
+    insert into admin_counter_slots (name, slot, value)
+    values (p_name, floor(random() * 16)::smallint, p_delta)
+    on conflict (name, slot) do update
+    set value = admin_counter_slots.value + p_delta;
+$$;
+
+-- Recontagem completa: zera os slots e grava o total no slot 0
+create or replace function refresh_admin_counters()
+returns void
+language plpgsql
+as $$
+begin
+    delete from post_authors;
+    insert into post_authors (user_id, posts_count)
+    select user_id, count(*) from posts where user_id is not null group by user_id;
+
+    delete from admin_counter_slots;
+    insert into admin_counter_slots (name, slot, value) values
+        ('total_users', 0, (select count(*) from users)),
+        ('total_posts', 0, (select count(*) from posts)),
+        ('total_comments', 0, (select count(*) from comments)),
+        ('active_users', 0, (select count(*) from post_authors));
+end;
+$$;
+
+select refresh_admin_counters();
+
+drop table if exists admin_counters;
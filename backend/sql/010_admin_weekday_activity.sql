@@ -0,0 +1,38 @@
+-- Gráfico "Engajamento Semanal" do painel admin (GET /admin/engagement).
+-- Conta posts e comentários por dia da semana dos últimos p_days dias no
+-- próprio banco e devolve só as 7 linhas, em vez de o painel baixar as
+-- tabelas inteiras. Os índices em created_at limitam a leitura à janela.
+-- Dia da semana no horário de Brasília (isodow: 1 = segunda, 7 = domingo).
+-- Rodar no SQL Editor do Supabase.
+
+create index if not exists posts_created_at_idx on posts (created_at);
+create index if not exists comments_created_at_idx on comments (created_at);
+
+create or replace function admin_weekday_activity(p_days integer default 7)
+returns table (weekday integer, posts bigint, comments bigint)
+language sql
+stable
+as $$
+    with since as (
+        select now() - make_interval(days => p_days) as at
+    ),
+    p as (
+        select extract(isodow from created_at at time zone 'America/Sao_Paulo')::integer as weekday,
+               count(*) as total
+        from posts
+        where created_at >= (select at from since)
+        group by 1
+    ),
+    c as (
+        select extract(isodow from created_at at time zone 'America/Sao_Paulo')::integer as weekday,
+               count(*) as total
+        from comments
+        where created_at >= (select at from since)
+        group by 1
+    )
+    select d.weekday, coalesce(p.total, 0), coalesce(c.total, 0)
+    from generate_series(1, 7) as d (weekday)
+    left join p using (weekday)
+    left join c using (weekday)
+    order by d.weekday;
+$$;
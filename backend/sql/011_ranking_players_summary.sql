@@ -0,0 +1,17 @@
+-- Resumo do ranking por jogadora (campo summary de GET /api/ranking-next-fiap/players),
+-- calculado da mesma tabela ranking_next_fiap_players que serve as páginas:
+-- jogadoras, tentativas (soma de attempts), acertos das melhores tentativas
+-- e recorde. Uma linha por jogadora, então o custo não cresce com as tentativas.
+-- Rodar no SQL Editor do Supabase.
+
+create or replace function ranking_players_summary()
+returns table (players bigint, attempts bigint, total_acertos bigint, record integer)
+language sql
+stable
+as $$
+    select count(*),
+           coalesce(sum(attempts), 0),
+           coalesce(sum(acertos), 0),
+           coalesce(max(pontos), 0)
+    from ranking_next_fiap_players;
+$$;